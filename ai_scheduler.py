@@ -0,0 +1,52 @@
+# ==== Time-sliced enemy AI ====
+# Enemy.update only integrates movement; the expensive "think" step
+# (targeting, weapon choice, shooting/melee) runs from here, staggered
+# across ticks and capped by a per-frame time budget. budget_ms=None drops
+# the wall-clock cap (headless runs: results must not depend on machine speed).
+import time
+
+AI_BUDGET_MS = 2.0        # max think time per frame (at least one enemy always thinks)
+AI_THINK_INTERVAL = 6     # ticks between thinks for enemies far from the player
+AI_NEAR_DIST = 400        # enemies closer than this think every tick
+
+
+class AIScheduler:
+    def __init__(self, budget_ms=AI_BUDGET_MS, interval=AI_THINK_INTERVAL, near_dist=AI_NEAR_DIST):
+        self.budget_ms = budget_ms
+        self.interval = interval
+        self.near_dist = near_dist
+        self.tick = 0
+        self._stagger = 0
+        self.thinks = 0       # enemies that thought last frame
+        self.deferred = 0     # due enemies pushed to a later frame by the budget
+
+    def run(self, enemies, player, bullets):
+        self.tick += 1
+        tick = self.tick
+        px, py = player.rect.center
+        near2 = self.near_dist*self.near_dist
+        due = []
+        for e in enemies:
+            if e.ai_next is None:
+                # first sighting: spread enemies over the interval
+                e.ai_last = tick - 1
+                e.ai_next = tick + self._stagger % self.interval
+                self._stagger += 1
+            if tick < e.ai_next: continue
+            ex, ey = e.rect.center
+            d2 = (ex - px)**2 + (ey - py)**2
+            near = d2 < near2
+            # near enemies first (closest first), then the most overdue far ones
+            due.append(((0, d2) if near else (1, e.ai_next - tick), near, e))
+        due.sort(key=lambda it: it[0])
+        t0 = time.perf_counter()
+        budget = None if self.budget_ms is None else self.budget_ms/1000.0
+        n = 0
+        for _, near, e in due:
+            if n and budget is not None and time.perf_counter() - t0 > budget: break
+            e.think(player, bullets, tick - e.ai_last)
+            e.ai_last = tick
+            e.ai_next = tick + (1 if near else self.interval)
+            n += 1
+        self.thinks = n
+        self.deferred = len(due) - n
@@ -0,0 +1,152 @@
+# ==== Precompiled asset cache ====
+# Source images (PNG/JPEG) are decoded once into raw pixel files laid out in
+# the display's pixel format; at runtime a file is memory-mapped and wrapped
+# with pygame.image.frombuffer, so loading costs page faults, not a codec.
+#
+#   python asset_cache.py              # compile every image in the repo
+#   python asset_cache.py --bench      # codec load vs cached load
+#
+# Cache files are named <stem>-<source sha1>-<format>.raw, so editing a source
+# or changing the format just produces a new file; index.json remembers the
+# hash per (path, size, mtime) so a load does not re-read the source.
+import argparse, glob, hashlib, json, mmap, os, struct, time
+import pygame
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR = os.path.join(HERE, ".asset_cache")
+ASSET_GLOBS = ("*.png", "*.jpg", "*.jpeg")
+
+# ARGB8888 (BGRA bytes on little-endian) is what convert_alpha() gives on the
+# usual 32-bit displays; opaque images are stored with alpha 255
+DEFAULT_FORMAT = "BGRA"
+RAW_MAGIC = b"PGRAW01\0"
+RAW_HEADER = struct.Struct("<8sII4s")
+RAW_DATA_OFFSET = 64       # pixel rows start here (keeps them 64-byte aligned)
+
+_index = None
+
+
+def asset_sources():
+    return sorted(p for g in ASSET_GLOBS for p in glob.glob(os.path.join(HERE, g)))
+
+
+def display_format():
+    # raw layout matching the display surface, when one is open
+    disp = pygame.display.get_surface() if pygame.display.get_init() else None
+    if disp is None or disp.get_bitsize() != 32: return DEFAULT_FORMAT
+    r, g, b, _ = disp.get_masks()
+    return {(0xff0000, 0xff00, 0xff): "BGRA", (0xff, 0xff00, 0xff0000): "RGBA"}.get((r, g, b), DEFAULT_FORMAT)
+
+
+def _load_index():
+    global _index
+    if _index is None:
+        try:
+            with open(os.path.join(CACHE_DIR, "index.json")) as f: _index = json.load(f)
+        except (OSError, ValueError):
+            _index = {}
+    return _index
+
+
+def _save_index():
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    tmp = os.path.join(CACHE_DIR, "index.json.tmp")
+    with open(tmp, "w") as f: json.dump(_index, f, indent=1)
+    os.replace(tmp, os.path.join(CACHE_DIR, "index.json"))
+
+
+def source_hash(src):
+    # sha1 of the source bytes, re-hashed only when size/mtime change
+    st = os.stat(src)
+    key = os.path.relpath(src, HERE)
+    ent = _load_index().get(key)
+    if ent and ent["size"] == st.st_size and ent["mtime_ns"] == st.st_mtime_ns:
+        return ent["sha1"]
+    h = hashlib.sha1()
+    with open(src, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""): h.update(chunk)
+    _index[key] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha1": h.hexdigest()}
+    _save_index()
+    return _index[key]["sha1"]
+
+
+def cache_path(src, fmt=DEFAULT_FORMAT):
+    stem = os.path.splitext(os.path.basename(src))[0]
+    return os.path.join(CACHE_DIR, f"{stem}-{source_hash(src)[:16]}-{fmt}.raw")
+
+
+def compile_asset(src, fmt=DEFAULT_FORMAT):
+    # decode once, write header + raw rows; returns the cache path
+    out = cache_path(src, fmt)
+    if os.path.exists(out): return out
+    surf = pygame.image.load(src)
+    w, h = surf.get_size()
+    if surf.get_bitsize() != 32 or not surf.get_masks()[3]:
+        rgba = pygame.Surface((w, h), pygame.SRCALPHA, 32)
+        rgba.blit(surf, (0, 0))
+        surf = rgba
+    pixels = pygame.image.tobytes(surf, fmt)
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    tmp = out + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(RAW_HEADER.pack(RAW_MAGIC, w, h, fmt.encode()).ljust(RAW_DATA_OFFSET, b"\0"))
+        f.write(pixels)
+    os.replace(tmp, out)
+    return out
+
+
+def load_raw(path):
+    # mmap + frombuffer: no decode, no copy. The mapping is private
+    # (copy-on-write), so drawing onto the surface never touches the file.
+    with open(path, "rb") as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+    magic, w, h, fmt = RAW_HEADER.unpack_from(mm)
+    if magic != RAW_MAGIC: raise ValueError(f"{path}: not a raw asset file")
+    view = memoryview(mm)[RAW_DATA_OFFSET:RAW_DATA_OFFSET + w*h*4]
+    return pygame.image.frombuffer(view, (w, h), fmt.decode())
+
+
+def load(src, fmt=None):
+    # cached surface for a source image, compiling it on first use
+    fmt = fmt or display_format()
+    path = cache_path(src, fmt)
+    if not os.path.exists(path): compile_asset(src, fmt)
+    return load_raw(path)
+
+
+def display_ready(surf):
+    # main thread, display open: keep the mapped surface when its layout already
+    # matches the display (blits take the fast path), else convert (copies)
+    disp = pygame.display.get_surface()
+    if disp is None or (surf.get_bitsize() == 32 and surf.get_masks()[:3] == disp.get_masks()[:3]):
+        return surf
+    return surf.convert_alpha()
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Compile images into the raw pixel cache")
+    ap.add_argument("sources", nargs="*", help=f"images to compile (default: {', '.join(ASSET_GLOBS)} in the repo)")
+    ap.add_argument("--format", default=DEFAULT_FORMAT, choices=("BGRA", "RGBA"), help="raw pixel layout")
+    ap.add_argument("--bench", action="store_true", help="time codec loads against cached loads")
+    args = ap.parse_args(argv)
+
+    sources = [os.path.abspath(s) for s in args.sources] or asset_sources()
+    for src in sources:
+        t0 = time.perf_counter()
+        out = compile_asset(src, args.format)
+        print(f"{os.path.basename(src):>45} -> {os.path.basename(out)} ({(time.perf_counter()-t0)*1000:.1f} ms)")
+    if args.bench:
+        # both timings include one full blit, so the cached side pays its page faults
+        for src in sources:
+            t0 = time.perf_counter(); surf = pygame.image.load(src)
+            pygame.Surface(surf.get_size(), pygame.SRCALPHA, 32).blit(surf, (0, 0))
+            t_codec = time.perf_counter() - t0
+            t0 = time.perf_counter(); raw = load(src, args.format)
+            pygame.Surface(raw.get_size(), pygame.SRCALPHA, 32).blit(raw, (0, 0))
+            t_raw = time.perf_counter() - t0
+            print(f"{os.path.basename(src):>45} {surf.get_width()}x{surf.get_height()}: "
+                  f"codec {t_codec*1000:6.1f} ms, cached {t_raw*1000:6.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
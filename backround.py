@@ -2,6 +2,7 @@ import pygame
 import sys
 import random
 import math
+from bg_cache import PaletteLUT, SkyGradient, CloudSprites, TwinkleLayer, LANDSCAPE_SKY
 
 pygame.init()
 
@@ -31,37 +32,49 @@ clouds = [
     [580, 60, 90, 30]
 ]
 cloud_speed = 0.3
+CLOUD_COUNT = 4        # их болгоход (жишээ нь 300) нэмэлт үүлс үүсгэнэ
+_rnd = random.Random(4)
+for i in range(len(clouds), CLOUD_COUNT):
+    w = _rnd.randint(60, 160)
+    # 5 дахь утга: sprite-ийн хувилбар (нэмэлт үүлс л ил тод байдлаараа ялгаатай)
+    clouds.append([_rnd.uniform(-w, WIDTH), _rnd.randint(30, 120), w, int(w*_rnd.uniform(0.25, 0.35)), i])
+# нэгж эллипсийг (w, h)-ээр томруулсан зөөлөн ирмэгтэй sprite
+cloud_sprites = CloudSprites([(0, 0, 1, 1)])
 
 # ---------- Sparkle (газрын гялтганах effect) ----------
-sparkles = [(random.randint(0, WIDTH), random.randint(350, 420)) for _ in range(25)]
+SPARKLE_COUNT = 25
+sparkles = [(random.randint(0, WIDTH - 1), random.randint(350, 420)) for _ in range(SPARKLE_COUNT)]
 
 # ---------- Одод ----------
-stars = [(random.randint(0, WIDTH), random.randint(0, 250)) for _ in range(70)]
+STAR_COUNT = 70        # мянга болгосон ч кадрын Python ажил өсөхгүй
+stars = [(random.randint(0, WIDTH - 1), random.randint(0, 250)) for _ in range(STAR_COUNT)]
+
+# Анивчилт: noise хүснэгтээс alpha-г surfarray-аар бөөнөөр бичнэ
+star_layer = TwinkleLayer(stars, color=(200, 200, 255), seed=1)
+sparkle_layer = TwinkleLayer(sparkles, lo=120, hi=255, seed=2)
+frame = 0
 
 # ---------- Өдрийн мөчлөг ----------
 time_angle = 0  # 0–2π мөчлөг
 
-def lerp_color(c1, c2, t):
-    return (
-        int(c1[0] + (c2[0] - c1[0]) * t),
-        int(c1[1] + (c2[1] - c1[1]) * t),
-        int(c1[2] + (c2[2] - c1[2]) * t),
-    )
+# ---------- Тэнгэрийн палитр (bg_cache-д нэг удаа бэлтгэнэ) ----------
+sky_lut = PaletteLUT(LANDSCAPE_SKY)
+sky_gradient = SkyGradient(sky_lut)
+
+# ---------- Сар (хавирган сарыг alpha-тай sprite болгож нэг удаа зурна) ----------
+moon_sprite = pygame.Surface((70, 70), pygame.SRCALPHA)
+pygame.draw.circle(moon_sprite, MOON_COLOR, (35, 35), 35)
+# Сарны сүүдэр: градиентын дээр ил тод нүх үлдээнэ
+pygame.draw.circle(moon_sprite, (0, 0, 0, 0), (25, 35), 28)
+moon_sprite = moon_sprite.convert_alpha()
 
 def get_sky_color(t):
     """Тэнгэрийн өнгө (үүр → өдөр → орой → шөнө)"""
-    if t < 0.25:
-        return lerp_color((30, 40, 90), (138, 197, 255), t * 4)
-    elif t < 0.5:
-        return lerp_color((138, 197, 255), (255, 150, 80), (t - 0.25) * 4)
-    elif t < 0.75:
-        return lerp_color((255, 150, 80), (10, 15, 40), (t - 0.5) * 4)
-    else:
-        return lerp_color((10, 15, 40), (30, 40, 90), (t - 0.75) * 4)
+    return sky_lut(t)
 
 def draw_scene(sky_color, sun_y, moon_y, t):
-    # Тэнгэрийн өнгө
-    screen.fill(sky_color)
+    # Тэнгэрийн өнгө (босоо градиент, кэшлэсэн туузаар)
+    sky_gradient.draw(screen, t)
 
     # Нар (өдрийн үед л)
     if t < 0.55:
@@ -70,19 +83,20 @@ def draw_scene(sky_color, sun_y, moon_y, t):
     # Сар (шөнийн үед л)
     if t > 0.45:
         moon_x = 120
-        pygame.draw.circle(screen, MOON_COLOR, (moon_x, int(moon_y)), 35)
-        # Сарны гэрэлт сүүдэр (crescent effect)
-        pygame.draw.circle(screen, sky_color, (moon_x - 10, int(moon_y)), 28)
+        # Сарны гэрэлт сүүдэр (crescent effect) sprite-д ил тод
+        screen.blit(moon_sprite, (moon_x - 35, int(moon_y) - 35))
 
     # Одод (шөнө гарах)
     if t > 0.55:
-        for (x, y) in stars:
-            brightness = random.randint(150, 255)
-            pygame.draw.circle(screen, (brightness, brightness, 255), (x, y), 1)
+        star_layer.update(frame)
+        star_layer.draw(screen)
 
-    # Үүлс
+    # Үүлс (кэшлэсэн sprite, үүл бүрт нэг blit)
+    blits = []
     for c in clouds:
-        pygame.draw.ellipse(screen, CLOUD, c)
+        spr, (dx, dy) = cloud_sprites.get((c[2], c[3]), c[4] if len(c) > 4 else 0)
+        blits.append((spr, (int(c[0]) + dx, c[1] + dy)))
+    screen.blits(blits, doreturn=False)
 
     # Уул
     pygame.draw.polygon(screen, MOUNTAIN_DARK, [(0, 300), (250, 150), (450, 170), (700, 320), (WIDTH, HEIGHT), (0, HEIGHT)])
@@ -113,9 +127,8 @@ def draw_scene(sky_color, sun_y, moon_y, t):
 
 
     # Газрын гялтганах effect
-    brightness = int(255 * (1 - abs(math.sin(time_angle))))
-    for (x, y) in sparkles:
-        pygame.draw.circle(screen, (brightness, brightness, brightness), (x, y), 1)
+    sparkle_layer.update(frame, 1 - abs(math.sin(time_angle)))
+    sparkle_layer.draw(screen)
 
 def move_clouds():
     for c in clouds:
@@ -131,6 +144,7 @@ while True:
             sys.exit()
 
     move_clouds()
+    frame += 1
 
     # Өдрийн мөчлөг 0–2π
     time_angle += 0.002
@@ -0,0 +1,212 @@
+# ==== Background caches shared by the game and backround.py ====
+# Palettes are baked into lookup tables once; sky gradients are baked per
+# quantized step of the day cycle as narrow full-height strips, so drawing the
+# sky is a row of blits that costs the same as one full-screen blit, and a
+# new step only builds a small strip.
+import random, threading
+import pygame
+
+try:
+    import numpy as np
+except ImportError:       # twinkle layers fall back to per-point set_at
+    np = None
+
+PALETTE_LUT_SIZE = 257     # 2**8 + 1 so the stops at 0.25/0.5/0.75 land on entries
+SKY_STEPS = 64            # quantized steps of t_frac (0..1)
+SKY_STRIP_W = 32          # px; narrower strips cost more blits, wider ones more memory per step
+ZENITH_SHADE = 0.28       # zenith = sky colour pulled towards ZENITH_TINT
+HORIZON_GLOW = 0.30       # horizon = sky colour pulled towards HORIZON_TINT
+ZENITH_TINT = (20, 30, 90)
+HORIZON_TINT = (255, 236, 210)
+
+# Day-cycle palettes as (t, colour) stops
+GAME_SKY = [(0.0, (135, 206, 235)), (0.5, (255, 160, 122)), (1.0, (10, 15, 35))]
+LANDSCAPE_SKY = [(0.0, (30, 40, 90)), (0.25, (138, 197, 255)), (0.5, (255, 150, 80)),
+                 (0.75, (10, 15, 40)), (1.0, (30, 40, 90))]
+
+
+def lerp_color(c1, c2, t):
+    return (int(c1[0] + (c2[0]-c1[0])*t),
+            int(c1[1] + (c2[1]-c1[1])*t),
+            int(c1[2] + (c2[2]-c1[2])*t))
+
+
+class PaletteLUT:
+    def __init__(self, stops, size=PALETTE_LUT_SIZE):
+        self.size = size
+        self.table = []
+        for i in range(size):
+            t = i/(size - 1)
+            for (t0, c0), (t1, c1) in zip(stops, stops[1:]):
+                if t <= t1:
+                    self.table.append(lerp_color(c0, c1, (t - t0)/(t1 - t0) if t1 > t0 else 0.0))
+                    break
+            else:
+                self.table.append(stops[-1][1])
+
+    def __call__(self, t):
+        i = int(t*(self.size - 1) + 0.5)
+        return self.table[0 if i < 0 else self.size - 1 if i >= self.size else i]
+
+
+class SkyGradient:
+    def __init__(self, lut, steps=SKY_STEPS):
+        self.lut = lut
+        self.steps = steps
+        # 2x3 zenith/sky/horizon swatch per step; stretched to a strip on demand
+        self.swatches = []
+        for i in range(steps):
+            sky = lut(i/(steps - 1))
+            sw = pygame.Surface((2, 3))
+            sw.fill(lerp_color(sky, ZENITH_TINT, ZENITH_SHADE), (0, 0, 2, 1))
+            sw.fill(sky, (0, 1, 2, 1))
+            sw.fill(lerp_color(sky, HORIZON_TINT, HORIZON_GLOW), (0, 2, 2, 1))
+            self.swatches.append(sw)
+        self.strips = {}        # (step, height, target format) -> SKY_STRIP_W x height gradient
+        self.hits = 0
+        self.misses = 0
+
+    def step(self, t):
+        i = int(t*(self.steps - 1) + 0.5)
+        return 0 if i < 0 else self.steps - 1 if i >= self.steps else i
+
+    def strip(self, t, h, like=None):
+        # like: surface whose pixel format the strip should share
+        fmt = None if like is None else (like.get_bitsize(), like.get_masks())
+        key = (self.step(t), h, fmt)
+        strip = self.strips.get(key)
+        if strip is not None:
+            self.hits += 1
+            return strip
+        self.misses += 1
+        column = pygame.transform.smoothscale(self.swatches[key[0]], (2, h))
+        strip = pygame.transform.scale(column, (SKY_STRIP_W, h))
+        if like is not None: strip = strip.convert(like)
+        self.strips[key] = strip
+        return strip
+
+    def draw(self, surface, t):
+        # fills the whole surface with the gradient for t, tiling the cached strip
+        w, h = surface.get_size()
+        strip = self.strip(t, h, surface)
+        surface.blits([(strip, (x, 0)) for x in range(0, w, SKY_STRIP_W)], doreturn=False)
+
+
+def display_thread():
+    # convert()/convert_alpha() against the display only on the thread that owns the window
+    return pygame.display.get_surface() is not None and threading.current_thread() is threading.main_thread()
+
+
+# Soft-edged cloud sprites, one per (quantized size, variant); clouds then
+# cost one blit each however many ellipses make up their shape.
+CLOUD_COLOR = (240, 245, 250)
+CLOUD_SIZE_QUANT = 0.05   # sizes closer than this share a sprite
+CLOUD_SOFT_PX = 4         # width of the soft alpha edge
+CLOUD_VARIANTS = (255, 225, 195)   # peak alpha per variant (thicker .. thinner)
+
+# game clouds: three overlapping puffs (x, y, w, h) at size 1.0, relative to the anchor
+GAME_CLOUD_PUFFS = [(-30, -12, 60, 24), (0, -16, 50, 30), (25, -12, 60, 24)]
+
+
+class CloudSprites:
+    def __init__(self, puffs, color=CLOUD_COLOR, soft=CLOUD_SOFT_PX, variants=CLOUD_VARIANTS):
+        self.puffs = puffs
+        self.color = color
+        self.soft = soft
+        self.variants = variants
+        self.sprites = {}
+        self.unconverted = set()    # keys of sprites still in the plain SRCALPHA format
+        self.hits = 0
+        self.misses = 0
+
+    def _q(self, v):
+        return round(v/CLOUD_SIZE_QUANT)*CLOUD_SIZE_QUANT
+
+    def get(self, size, variant=0):
+        # size: scale factor, or (sx, sy); returns (sprite, (dx, dy) from the anchor)
+        sx, sy = size if isinstance(size, tuple) else (size, size)
+        key = (self._q(sx), self._q(sy), variant % len(self.variants))
+        hit = self.sprites.get(key)
+        if hit is not None:
+            self.hits += 1
+            return hit
+        self.misses += 1
+        sx, sy, v = key
+        rects = [pygame.Rect(round(x*sx), round(y*sy), max(1, round(w*sx)), max(1, round(h*sy)))
+                 for x, y, w, h in self.puffs]
+        box = rects[0].unionall(rects[1:]).inflate(2, 2)
+        surf = pygame.Surface(box.size, pygame.SRCALPHA)
+        peak = self.variants[v]
+        # outer rings first, each inset ring more opaque: a soft alpha edge
+        for k in range(self.soft + 1):
+            a = peak*(k + 1)//(self.soft + 1)
+            for r in rects:
+                rr = r.move(-box.x, -box.y).inflate(-2*k, -2*k)
+                if rr.width > 0 and rr.height > 0:
+                    pygame.draw.ellipse(surf, (*self.color, a), rr)
+        if display_thread(): surf = surf.convert_alpha()
+        else: self.unconverted.add(key)     # baked on a worker: convert_all() on the main thread
+        hit = self.sprites[key] = (surf, (box.x, box.y))
+        return hit
+
+    def convert_all(self):
+        # main thread, once the display is open
+        if not display_thread(): return
+        for key in self.unconverted:
+            surf, off = self.sprites[key]
+            self.sprites[key] = (surf.convert_alpha(), off)
+        self.unconverted.clear()
+
+
+# Twinkling points (stars, ground sparkles) in one persistent alpha layer.
+# Brightness comes from a looping noise table indexed by frame + per-point
+# phase, written in bulk through surfarray, so Python work per frame does not
+# grow with the number of points.
+TWINKLE_FRAMES = 240      # length of the noise loop (frames)
+TWINKLE_KNOTS = 12        # random knots in the loop, linearly interpolated
+TWINKLE_DOT = ((-1, -1), (0, -1), (-1, 0), (0, 0))    # pixels pygame.draw.circle(.., r=1) covers
+
+
+class TwinkleLayer:
+    def __init__(self, points, color=(255, 255, 255), lo=150, hi=255, seed=0):
+        rnd = random.Random(seed)
+        xs = [p[0] for p in points]; ys = [p[1] for p in points]
+        self.origin = (min(xs) - 1, min(ys) - 1) if points else (0, 0)
+        w = (max(xs) - self.origin[0] + 1) if points else 1
+        h = (max(ys) - self.origin[1] + 1) if points else 1
+        self.layer = pygame.Surface((w, h), pygame.SRCALPHA)
+        self.layer.fill((*color, 0))
+        # every point lights the 2x2 block the old radius-1 circles drew
+        self.points = [(x - self.origin[0] + dx, y - self.origin[1] + dy)
+                       for x, y in points for dx, dy in TWINKLE_DOT]
+        knots = [rnd.uniform(lo, hi) for _ in range(TWINKLE_KNOTS)]
+        table = []
+        for f in range(TWINKLE_FRAMES):
+            u = f*TWINKLE_KNOTS/TWINKLE_FRAMES
+            k = int(u); fr = u - k
+            table.append(knots[k] + (knots[(k + 1) % TWINKLE_KNOTS] - knots[k])*fr)
+        self.table = table
+        self.phase = [ph for _ in points for ph in [rnd.randrange(TWINKLE_FRAMES)]*len(TWINKLE_DOT)]
+        if np is not None:
+            self.np_x = np.array([p[0] for p in self.points], dtype=np.intp)
+            self.np_y = np.array([p[1] for p in self.points], dtype=np.intp)
+            self.np_table = np.array(table, dtype=np.float32)
+            self.np_phase = np.array(self.phase, dtype=np.intp)
+
+    def update(self, frame, scale=1.0):
+        # scale (0..1) dims every point, e.g. stars fading in at dusk
+        if not self.points: return
+        if np is not None:
+            vals = self.np_table[(self.np_phase + frame) % TWINKLE_FRAMES]*scale
+            alpha = pygame.surfarray.pixels_alpha(self.layer)
+            alpha[self.np_x, self.np_y] = vals.astype(np.uint8)
+            del alpha      # unlock the surface
+        else:
+            table = self.table; n = TWINKLE_FRAMES; layer = self.layer
+            for (x, y), ph in zip(self.points, self.phase):
+                c = layer.get_at((x, y))
+                c.a = int(table[(ph + frame) % n]*scale)
+                layer.set_at((x, y), c)
+
+    def draw(self, surface):
+        surface.blit(self.layer, self.origin)
@@ -0,0 +1,66 @@
+# ==== Pipelined background rendering ====
+# The background layers (sky, stars, mountains, trees, clouds) for the next
+# frame are drawn on a worker thread into the back half of a double buffer
+# while the main thread runs the simulation; pygame releases the GIL inside
+# most fills and blits. The main thread then composites the finished buffer.
+import threading
+import pygame
+
+
+class BackgroundPipeline:
+    def __init__(self, render):
+        # render(surface, *args) draws one background frame into `surface`
+        self.render = render
+        self.front = None        # last finished frame (main thread only)
+        self.back = None         # being drawn by the worker
+        self._job = None
+        self._busy = False
+        self._error = None
+        self._stop = False
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._loop, name="bg-render", daemon=True)
+        self._thread.start()
+
+    def _surface(self, size):
+        surf = pygame.Surface(size)
+        return surf.convert() if pygame.display.get_surface() is not None else surf
+
+    def submit(self, size, *args):
+        with self._cond:
+            while self._busy: self._cond.wait()
+            if self.back is None or self.back.get_size() != size:
+                self.back = self._surface(size)
+            self._job = args
+            self._busy = True
+            self._cond.notify_all()
+
+    def wait(self):
+        # finished frame from the last submit(); swaps the buffers
+        with self._cond:
+            while self._busy: self._cond.wait()
+            if self._error is not None:
+                err, self._error = self._error, None
+                raise err
+            self.front, self.back = self.back, self.front
+            return self.front
+
+    def _loop(self):
+        while True:
+            with self._cond:
+                while self._job is None and not self._stop: self._cond.wait()
+                if self._stop: return
+                args, self._job = self._job, None
+                surf = self.back
+            try:
+                self.render(surf, *args)
+            except Exception as e:      # re-raised on the main thread in wait()
+                self._error = e
+            with self._cond:
+                self._busy = False
+                self._cond.notify_all()
+
+    def close(self):
+        with self._cond:
+            self._stop = True
+            self._cond.notify_all()
+        self._thread.join(timeout=1.0)
@@ -0,0 +1,50 @@
+# ==== On-demand cProfile capture ====
+# Profiles exactly N iterations of the game loop (paused over the frame
+# pacing wait) and writes a .prof named with the time and the scene (entity
+# counts), e.g.
+#   profile-20251016-110031-e10-b3-p240-120f.prof
+# Open with: python -m pstats FILE  (or snakeviz FILE)
+import cProfile, time
+
+PROFILE_FRAMES = 120
+
+
+class FrameProfiler:
+    def __init__(self):
+        self.prof = None
+        self.left = 0
+        self.frames = 0
+        self.last_path = None
+
+    @property
+    def active(self):
+        return self.prof is not None
+
+    def request(self, frames=PROFILE_FRAMES):
+        # takes effect at the next frame_begin(), so the capture covers whole iterations
+        if self.prof is None: self.left = self.frames = frames
+
+    def frame_begin(self):
+        # call in every loop iteration right after the pacing wait, so sleeping
+        # or spinning until the next frame never shows up in the capture
+        if self.left > 0:
+            if self.prof is None: self.prof = cProfile.Profile()
+            self.prof.enable()
+
+    def frame_end(self, scene):
+        # call once at the end of every loop iteration; scene: {"e": 10, "b": 3, ...}
+        # returns the .prof path on the frame the capture finishes
+        if self.prof is None: return None
+        self.prof.disable()
+        self.left -= 1
+        if self.left > 0: return None
+        tag = "-".join(f"{k}{v}" for k, v in scene.items())
+        self.last_path = time.strftime("profile-%Y%m%d-%H%M%S") + f"-{tag}-{self.frames}f.prof"
+        self.prof.dump_stats(self.last_path)
+        self.prof = None
+        return self.last_path
+
+    def stop(self):
+        # window closed mid-capture: drop it
+        if self.prof is not None: self.prof.disable(); self.prof = None
+        self.left = 0
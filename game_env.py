@@ -0,0 +1,220 @@
+# ==== Gym-style environment around the game (for training bots) ====
+# GameEnv drives one headless game (one per process: the game keeps its
+# state in module globals). VecGameEnv steps N of them in subprocesses; the
+# observations, actions and rewards live in shared memory, so a step only
+# sends a one-word command down each pipe.
+#
+#   env = VecGameEnv(8)
+#   obs = env.reset()
+#   obs, rew, term, trunc, infos = env.step(actions)   # actions: (8, 6) int array
+#
+# A finished env resets itself inside step(); its last observation is in
+# infos[i]["final_observation"].
+import multiprocessing as mp
+from multiprocessing import shared_memory
+import numpy as np
+import pygame
+
+from input_replay import HeldKeys
+from sweep import load_game
+
+# action vector: [move (0=left, 1=none, 2=right), jump, attack, switch, shield, mount]
+ACTION_DIMS = (3, 2, 2, 2, 2, 2)
+OBS_ENEMIES = 8            # nearest enemies observed
+PLAYER_FEATURES = 10       # x, y, vx, vy, health, weapon, mounted, shield, on_ground, attack_cd
+ENEMY_FEATURES = 5         # dx, dy, health, weapon, present
+ENV_MAX_TICKS = 60*60*3
+
+REWARD_KILL = 1.0
+REWARD_DAMAGE = 0.01       # per point of damage dealt
+REWARD_HURT = -0.01        # per point of damage taken
+REWARD_WIN = 5.0
+REWARD_DEATH = -5.0
+
+
+class GameEnv:
+    def __init__(self, frame_size=None, frame_skip=1, max_ticks=ENV_MAX_TICKS, seed=None):
+        # frame_size=(w, h) adds a downsampled RGB frame to each observation
+        self.g = load_game()
+        self.frame_size = frame_size
+        self.frame_skip = frame_skip
+        self.max_ticks = max_ticks
+        self.g.RENDER_POSES = frame_size is not None
+        self.g.AI_BUDGET = None     # reproducible episodes, independent of machine speed
+        if frame_size is not None: self.g.init_display()     # frames render into g.screen
+        self.rng = np.random.default_rng(seed)
+        self.tick = 0
+        self.obs = {"player": np.zeros(PLAYER_FEATURES, np.float32),
+                    "enemies": np.zeros((OBS_ENEMIES, ENEMY_FEATURES), np.float32)}
+        if frame_size is not None:
+            self.obs["frame"] = np.zeros((frame_size[1], frame_size[0], 3), np.uint8)
+
+    def reset(self, seed=None):
+        g = self.g
+        if seed is not None: self.rng = np.random.default_rng(seed)
+        g.ensure_level()        # build before seeding, so every episode draws the same numbers
+        g.random.seed(int(self.rng.integers(1 << 31)))
+        g.last_switch = g.last_mount_toggle = -1000
+        g.restart_game()
+        self.tick = 0
+        self._hp = self._enemy_hp()
+        self._kills_base = len(g.enemies)
+        return self._observe(), {}
+
+    def _enemy_hp(self):
+        return sum(e.health for e in self.g.enemies)
+
+    def step(self, action):
+        g = self.g; p = g.player
+        move, jump, attack, switch, shield, mount = (int(a) for a in action)
+        held = (["a"] if move == 0 else ["d"] if move == 2 else []) + (["w"] if jump else [])
+        keys = HeldKeys(held)
+        acts = [a for a, on in (("switch", switch), ("mount", mount), ("shield", shield), ("attack", attack)) if on]
+        hurt0 = p.damage_taken; alive0 = len(g.enemies)
+        for i in range(self.frame_skip):
+            now = self.tick*1000//g.FPS
+            if i == 0:
+                for a in acts: g.handle_action(a, now)
+            g.step_world(keys, (0, 0), self.tick/g.FPS)
+            self.tick += 1
+            if g.game_over or g.game_won: break
+        hp = self._enemy_hp()
+        kills = alive0 - len(g.enemies)
+        # damage dealt = lost health of survivors + what the killed ones had left
+        dealt = max(0, self._hp - hp)
+        self._hp = hp
+        reward = (REWARD_KILL*kills + REWARD_DAMAGE*dealt + REWARD_HURT*(p.damage_taken - hurt0)
+                  + (REWARD_WIN if g.game_won else 0.0) + (REWARD_DEATH if g.game_over else 0.0))
+        terminated = g.game_over or g.game_won
+        truncated = not terminated and self.tick >= self.max_ticks
+        info = {"tick": self.tick, "kills": self._kills_base - len(g.enemies), "health": p.health,
+                "won": g.game_won}
+        return self._observe(), reward, terminated, truncated, info
+
+    def _observe(self):
+        g = self.g; p = g.player
+        po = self.obs["player"]
+        po[:] = (p.rect.centerx/g.LEVEL_W, p.rect.centery/g.LEVEL_H, p.vel.x/g.HORSE_SPEED, p.vel.y/30.0,
+                 p.health/100.0, p.weapon == "bow", p.mounted, p.shield_active, p.on_ground, p.attack_cd/20.0)
+        eo = self.obs["enemies"]; eo[:] = 0
+        px, py = p.rect.center
+        near = sorted(g.enemies, key=lambda e: abs(e.rect.centerx - px))[:OBS_ENEMIES]
+        for i, e in enumerate(near):
+            eo[i] = ((e.rect.centerx - px)/1000.0, (e.rect.centery - py)/1000.0, e.health/80.0,
+                     e.weapon == "bow", 1.0)
+        if self.frame_size is not None:
+            g.render_frame(self.tick/g.FPS)
+            small = pygame.transform.smoothscale(g.screen, self.frame_size)
+            self.obs["frame"][:] = pygame.surfarray.array3d(small).transpose(1, 0, 2)
+        return self.obs
+
+
+# ---- vectorized wrapper ----
+def _shared(shape, dtype):
+    nbytes = max(1, int(np.prod(shape))*np.dtype(dtype).itemsize)
+    shm = shared_memory.SharedMemory(create=True, size=nbytes)
+    return shm, np.ndarray(shape, dtype, buffer=shm.buf)
+
+
+def _worker(idx, conn, specs, env_kwargs):
+    shms = {k: shared_memory.SharedMemory(name=name) for k, (name, _, _) in specs.items()}
+    bufs = {k: np.ndarray(shape, dtype, buffer=shms[k].buf) for k, (_, shape, dtype) in specs.items()}
+    env = GameEnv(**env_kwargs)
+
+    def publish(obs):
+        bufs["player"][idx] = obs["player"]
+        bufs["enemies"][idx] = obs["enemies"]
+        if "frame" in bufs: bufs["frame"][idx] = obs["frame"]
+
+    try:
+        while True:
+            cmd, arg = conn.recv()
+            if cmd == "step":
+                obs, rew, term, trunc, info = env.step(bufs["actions"][idx])
+                if term or trunc:
+                    info["final_info"] = dict(info)
+                    # reset() refills env.obs in place, so keep the terminal obs as copies
+                    info["final_observation"] = {k: v.copy() for k, v in obs.items()}
+                    obs, _ = env.reset()     # auto-reset; the next obs starts a new episode
+                publish(obs)
+                bufs["rewards"][idx] = rew; bufs["terminated"][idx] = term; bufs["truncated"][idx] = trunc
+                conn.send(info)
+            elif cmd == "reset":
+                obs, info = env.reset(seed=arg)
+                publish(obs)
+                conn.send(info)
+            elif cmd == "close":
+                break
+    finally:
+        for shm in shms.values(): shm.close()
+        conn.close()
+
+
+class VecGameEnv:
+    def __init__(self, n, frame_size=None, **env_kwargs):
+        self.n = n
+        shapes = {"player": ((n, PLAYER_FEATURES), np.float32),
+                  "enemies": ((n, OBS_ENEMIES, ENEMY_FEATURES), np.float32),
+                  "actions": ((n, len(ACTION_DIMS)), np.int64),
+                  "rewards": ((n,), np.float32),
+                  "terminated": ((n,), np.bool_),
+                  "truncated": ((n,), np.bool_)}
+        if frame_size is not None:
+            shapes["frame"] = ((n, frame_size[1], frame_size[0], 3), np.uint8)
+        self._shms = {}; self.bufs = {}
+        for k, (shape, dtype) in shapes.items():
+            self._shms[k], self.bufs[k] = _shared(shape, dtype)
+        specs = {k: (self._shms[k].name, shape, dtype) for k, (shape, dtype) in shapes.items()}
+        env_kwargs["frame_size"] = frame_size
+        ctx = mp.get_context("spawn")     # each worker imports its own game / SDL state
+        self.conns = []; self.procs = []
+        for i in range(n):
+            parent, child = ctx.Pipe()
+            proc = ctx.Process(target=_worker, args=(i, child, specs, env_kwargs), daemon=True)
+            proc.start(); child.close()
+            self.conns.append(parent); self.procs.append(proc)
+
+    def _obs(self):
+        # copies: the shared buffers are overwritten by the next step / reset
+        # (read self.bufs directly to skip the copy)
+        obs = {"player": self.bufs["player"].copy(), "enemies": self.bufs["enemies"].copy()}
+        if "frame" in self.bufs: obs["frame"] = self.bufs["frame"].copy()
+        return obs
+
+    def reset(self, seed=None):
+        for i, c in enumerate(self.conns):
+            c.send(("reset", None if seed is None else seed + i))
+        for c in self.conns: c.recv()
+        return self._obs()
+
+    def step(self, actions):
+        self.bufs["actions"][:] = actions
+        for c in self.conns: c.send(("step", None))
+        infos = [c.recv() for c in self.conns]
+        return (self._obs(), self.bufs["rewards"].copy(), self.bufs["terminated"].copy(),
+                self.bufs["truncated"].copy(), infos)
+
+    def close(self):
+        for c in self.conns:
+            try: c.send(("close", None))
+            except (BrokenPipeError, OSError): pass
+        for p in self.procs: p.join(timeout=5)
+        for shm in self._shms.values():
+            shm.close(); shm.unlink()
+
+
+if __name__ == "__main__":
+    # quick throughput check: python game_env.py [n_envs] [steps]
+    import sys, time
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else mp.cpu_count()
+    steps = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    env = VecGameEnv(n)
+    env.reset(seed=0)
+    rng = np.random.default_rng(0)
+    t0 = time.perf_counter()
+    for _ in range(steps):
+        acts = np.stack([rng.integers(0, d, n) for d in ACTION_DIMS], axis=1)
+        env.step(acts)
+    dt = time.perf_counter() - t0
+    env.close()
+    print(f"{n} envs x {steps} steps: {n*steps/dt:.0f} steps/s")
@@ -1,5 +1,24 @@
-import math, random, pygame
+import time
+_T_IMPORT = time.perf_counter()
+import functools, math, random, sys, pygame
 from pygame.locals import *
+from spatial import SweepAndPrune, ProximityGrid, PlatformGrid
+from ai_scheduler import AIScheduler, AI_BUDGET_MS
+from bg_cache import PaletteLUT, SkyGradient, CloudSprites, GAME_SKY, GAME_CLOUD_PUFFS
+from lighting import LightMap
+from particles import ParticleSystem
+from weather import Weather
+from input_replay import InputRecorder
+from bg_worker import BackgroundPipeline
+from pose_pool import PosePool, POSE_WORKERS
+from loader import Loader, run_loading_screen
+from telemetry import Telemetry, rss_mb, hit_rate
+from frame_profiler import FrameProfiler, PROFILE_FRAMES
+from trace_events import Tracer
+from gc_monitor import GCMonitor
+from hitch import HitchWatchdog, HITCH_MULT
+from mem_report import MemReport
+from pacing import FramePacer, PACING_MODES
 
 # ==== Embedded background (from backround.py) ====
 # Colors
@@ -21,40 +40,41 @@ clouds = [
     {"x": 680, "y": 70, "speed": 0.18, "size": 1.1},
     {"x": 900, "y": 90, "speed": 0.22, "size": 1.3},
 ]
+CLOUD_COUNT = 5        # raise (e.g. 300) for a denser sky; extras are generated
 stars = []
 
 def ensure_bg_init(surface):
     global stars
+    W, H = surface.get_size()
     if not stars:
-        W, H = surface.get_size()
         stars = [(random.randint(0, W), random.randint(0, H//2)) for _ in range(180)]
+    if len(clouds) < CLOUD_COUNT:
+        rnd = random.Random(len(clouds))
+        for i in range(len(clouds), CLOUD_COUNT):
+            clouds.append({"x": rnd.uniform(-120, W + 120), "y": rnd.uniform(30, H*0.35),
+                           "speed": rnd.uniform(0.1, 0.3), "size": rnd.uniform(0.5, 1.5), "variant": i})
+
+cloud_sprites = CloudSprites(GAME_CLOUD_PUFFS)
 
-def lerp_color(c1, c2, t):
-    return (int(c1[0] + (c2[0]-c1[0])*t),
-            int(c1[1] + (c2[1]-c1[1])*t),
-            int(c1[2] + (c2[2]-c1[2])*t))
+# day -> dusk -> night palette, baked once (see bg_cache.GAME_SKY)
+sky_lut = PaletteLUT(GAME_SKY)
+sky_gradient = SkyGradient(sky_lut)
 
 def get_sky_color(t):
-    # day-night blend
-    day = (135, 206, 235)
-    dusk= (255, 160, 122)
-    night=(10, 15, 35)
-    if t < 0.5:
-        return lerp_color(day, dusk, t/0.5)
-    else:
-        return lerp_color(dusk, night, (t-0.5)/0.5)
+    return sky_lut(t)
 
 bg_offset_x = 0.0  # updated every frame from camera offset
 
-def draw_scene_bg(surface, sky_color, sun_y, moon_y, t_frac):
+def draw_scene_bg(surface, sky_color, sun_y, moon_y, t_frac, offset_x=None):
+    # offset_x: camera x for this frame (the bg worker thread passes it explicitly)
     ensure_bg_init(surface)
-    global bg_offset_x
+    ox = bg_offset_x if offset_x is None else offset_x
     W, H = surface.get_size()
-    surface.fill(sky_color)
+    sky_gradient.draw(surface, t_frac)
 
     # Sun & Moon (slight parallax)
-    pygame.draw.circle(surface, SUN_COLOR, (int(W*0.2 - bg_offset_x*0.1), int(sun_y)), 28)
-    pygame.draw.circle(surface, MOON_COLOR,(int(W*0.75 - bg_offset_x*0.1), int(moon_y)), 20, 2)
+    pygame.draw.circle(surface, SUN_COLOR, (int(W*0.2 - ox*0.1), int(sun_y)), 28)
+    pygame.draw.circle(surface, MOON_COLOR,(int(W*0.75 - ox*0.1), int(moon_y)), 20, 2)
 
     # Stars at night
     if t_frac > 0.5:
@@ -67,12 +87,12 @@ def draw_scene_bg(surface, sky_color, sun_y, moon_y, t_frac):
 
     # Mountains layers (parallax)
     def _mx(x, fac):
-        return x - bg_offset_x*fac
+        return x - ox*fac
     pygame.draw.polygon(surface, MOUNTAIN_DARK, [(_mx(0,0.20), H*0.75), (_mx(W*0.25,0.20), H*0.55), (_mx(W*0.5,0.20), H*0.76), (_mx(W*0.8,0.20), H*0.6), (_mx(W,0.20), H*0.78), (_mx(W,0.20), H), (_mx(0,0.20), H)])
     pygame.draw.polygon(surface, MOUNTAIN_LIGHT,[(_mx(0,0.35), H*0.85), (_mx(W*0.25,0.35), H*0.65), (_mx(W*0.48,0.35), H*0.88), (_mx(W*0.7,0.35), H*0.7), (_mx(W,0.35), H*0.9), (_mx(W,0.35), H), (_mx(0,0.35), H)])
 
     # Ground (parallax)
-    gx = int(-bg_offset_x*0.5) % W
+    gx = int(-ox*0.5) % W
     pygame.draw.rect(surface, GRASS, (gx - W, int(H*0.85), W, int(H*0.15)))
     pygame.draw.rect(surface, GRASS, (gx,     int(H*0.85), W, int(H*0.15)))
 
@@ -124,7 +144,7 @@ def draw_scene_bg(surface, sky_color, sun_y, moon_y, t_frac):
     # Place trees across a double-width strip for seamless wrap
     i = 0
     x = 0
-    base_offset = int(-bg_offset_x*0.5)
+    base_offset = int(-ox*0.5)
     while x < W + TREE_SPACING:
         jitter = _tree_jitter(i)
         px = (x + 8 + jitter + base_offset) % (W + TREE_SPACING)
@@ -133,14 +153,14 @@ def draw_scene_bg(surface, sky_color, sun_y, moon_y, t_frac):
         x += TREE_SPACING
         i += 1
 
-# Clouds
+# Clouds (cached soft sprites, one blit each)
+    blits = []
     for c in clouds:
-        cx = int((c["x"] - bg_offset_x*0.4) % (W+120)) - 60
+        cx = int((c["x"] - ox*0.4) % (W+120)) - 60
         cy = int(c["y"])
-        s  = c["size"]
-        pygame.draw.ellipse(surface, CLOUD, (cx-30*s, cy-12*s, 60*s, 24*s))
-        pygame.draw.ellipse(surface, CLOUD, (cx,       cy-16*s, 50*s, 30*s))
-        pygame.draw.ellipse(surface, CLOUD, (cx+25*s,  cy-12*s, 60*s, 24*s))
+        spr, (dx, dy) = cloud_sprites.get(c["size"], c.get("variant", 0))
+        blits.append((spr, (cx + dx, cy + dy)))
+    surface.blits(blits, doreturn=False)
 
 def move_clouds_bg(surface):
     W, H = surface.get_size()
@@ -187,6 +207,7 @@ ARM_SWAY = 0.35
 ARM_GRAVITY = 3.5
 BOW_PULL = 8
 SWORD_SWING_DEG = 26
+SWORD_SWING_RAD = math.radians(SWORD_SWING_DEG)
 
 WALK_FREQ = 10.0
 WALK_AMP = 10.0
@@ -196,24 +217,91 @@ HORSE_SPEED = 10
 HORSE_JUMP = 18
 MOUNT_RANGE = 120              # was 54 → make mounting easier
 MOUNT_COOLDOWN_MS = 200        # a bit more responsive
+MOUNT_QUERY_R = MOUNT_RANGE + 64   # covers the inflated-rect check in can_mount
 
 # Enemy AI
 RANGED_DIST = 750
 MELEE_DIST = 750
 ENEMY_SHOOT_CD = 750
 ENEMY_SWING_CD = 750
-
-pygame.init()
-screen = pygame.display.set_mode((WIDTH, HEIGHT))
-pygame.display.set_caption("Human Enemies + Horse Mount (E fix) — dmg15")
-clock = pygame.time.Clock()
-font = pygame.font.SysFont("", 18)
-pygame.mouse.set_visible(False)
-pygame.event.set_grab(True)
+ENEMY_LOS_CHECK = True         # hold fire while a platform blocks the shot
+
+# Damage (balance knobs, see sweep.py)
+SWORD_DAMAGE = 40
+ARROW_DAMAGE = 28
+ENEMY_SWORD_DAMAGE = 40
+ENEMY_ARROW_DAMAGE = 2
+
+# Headless runs (sweep.py) skip pose rasterization; simulation is unchanged
+RENDER_POSES = True
+POSE_VIEW_PAD = 128            # rasterize humanoids this close to the screen edge too
+# Draw the next frame's background on a worker thread while the simulation runs
+PIPELINED_BG = False
+
+# Night lighting (radius, additive colour)
+PLAYER_LIGHT = (120, (190, 160, 110))
+ARROW_LIGHT = (28, (170, 150, 80))
+ENEMY_BULLET_LIGHT = (28, (190, 80, 60))
+LANTERN_LIGHT = (150, (230, 180, 90))
+LANTERN_SPACING = 1200
+
+# Particle colours / landing dust threshold
+SPARK_COLOR = (255, 220, 140)
+BLOOD_COLOR = (180, 40, 40)
+DUST_COLOR = (150, 125, 95)
+DEATH_COLOR = (110, 150, 110)
+LANDING_DUST_VY = 6
+
+# display, clock and fonts are set up by init_display() (main() / game_env);
+# headless runs (sweep.py) never open a window
+screen = None
+clock = None
+
+def init_display(vsync=False):
+    # only the subsystems the game uses (pygame.init() also starts audio, joystick, ...)
+    # returns False if vsync was asked for but the driver refused it
+    global screen, clock
+    pygame.display.init()
+    pygame.font.init()
+    ok = True
+    try:
+        screen = pygame.display.set_mode((WIDTH, HEIGHT), pygame.SCALED if vsync else 0, vsync=int(vsync))
+    except pygame.error:
+        screen = pygame.display.set_mode((WIDTH, HEIGHT))
+        ok = False
+    pygame.display.set_caption("Human Enemies + Horse Mount (E fix) — dmg15")
+    clock = pygame.time.Clock()
+    pygame.mouse.set_visible(False)
+    pygame.event.set_grab(True)
+    return ok
+
+@functools.lru_cache(maxsize=None)
+def get_font(size):
+    # default font; SysFont("") resolves to the same font after scanning the system font dirs
+    return pygame.font.Font(None, size)
 
 def clamp(v, a, b):
     return max(a, min(b, v))
 
+# ---- Animation sampler (periodic curves baked into a table) ----
+ANIM_TABLE_RES = 4096          # samples per full turn
+
+class AnimSampler:
+    def __init__(self, res=ANIM_TABLE_RES):
+        self.res = res
+        self.tab = [math.sin(2*math.pi*i/res) for i in range(res)]
+        self.k_rad = res/(2*math.pi)
+        self.k_deg = res/360.0
+        self.k_cyc = float(res)
+    def sin(self, x):          # x in radians
+        return self.tab[int(x*self.k_rad) % self.res]
+    def sin_deg(self, d):
+        return self.tab[int(d*self.k_deg) % self.res]
+    def sin_cycle(self, c):    # c in turns (1.0 = 2*pi)
+        return self.tab[int(c*self.k_cyc) % self.res]
+
+ANIM = AnimSampler()
+
 class Camera:
     def __init__(self,w,h):
         self.offset=pygame.Vector2(0,0); self.w=w; self.h=h
@@ -229,6 +317,18 @@ class Platform(pygame.sprite.Sprite):
         self.image=pygame.Surface((w,h)); self.image.fill((40,40,55))
         self.rect=self.image.get_rect(topleft=(x,y))
 
+class Lantern(pygame.sprite.Sprite):
+    # roadside lamp post, a scene light source at night
+    def __init__(self, x, ground_y):
+        super().__init__()
+        self.image=pygame.Surface((14,70), pygame.SRCALPHA)
+        pygame.draw.rect(self.image,(60,50,40),(5,10,4,60))
+        pygame.draw.rect(self.image,(255,210,120),(1,0,12,12))
+        self.rect=self.image.get_rect(midbottom=(x,ground_y))
+    def light(self, off):
+        r, c = LANTERN_LIGHT
+        return (self.rect.centerx - off.x, self.rect.top + 6 - off.y, r, c)
+
 class IKArm:
     def __init__(self, L1, L2, thick):
         self.L1=L1; self.L2=L2; self.thick=thick
@@ -310,6 +410,10 @@ class Horse(pygame.sprite.Sprite):
                     self.rect.left = p.rect.right
                 if vy > 0:
                     self.rect.bottom = p.rect.top
+                    if vy > LANDING_DUST_VY:
+                        for fx in (self.rect.left + 20, self.rect.right - 20):
+                            particles.emit(fx, self.rect.bottom - 2, int(vy*3), DUST_COLOR, speed=(0.5, 2.5),
+                                           life=(20, 40), angle=-math.pi/2, spread=math.pi*0.9, weight=0.2)
                     self.vel.y = 0
                     self.on_ground = True
                 if vy < 0:
@@ -320,6 +424,7 @@ class Horse(pygame.sprite.Sprite):
         return pygame.Vector2(self.rect.left + 36, self.rect.top + 8)
 
 class Humanoid(pygame.sprite.Sprite):
+    POSE_TINT = None               # body tint used by the pose stage
     def __init__(self, x, y):
         super().__init__()
         self.canvas = pygame.Surface((64,96), pygame.SRCALPHA)
@@ -343,10 +448,26 @@ class Humanoid(pygame.sprite.Sprite):
         self.walk_t = 0.0
         self.mounted = False
         self.mount = None
-
+        # per-tick pose samples (see _sample_pose)
+        self._spine_key = None; self._spine_s = 0.0
+        self._walk_s2 = 0.0; self._walk_s1 = 0.0
+        self._sway = 0.0; self._pulse = 0.0
+
+    def _spine_sin(self):
+        # spine_deg only changes on lean/aim, so cache its sine until it does
+        if self._spine_key != self.spine_deg:
+            self._spine_key = self.spine_deg
+            self._spine_s = ANIM.sin_deg(self.spine_deg)
+        return self._spine_s
+    def _sample_pose(self, time_s):
+        # sample every periodic curve once per tick; arms/legs/image share them
+        self._walk_s2 = ANIM.sin_cycle(self.walk_t)
+        self._walk_s1 = ANIM.sin_cycle(self.walk_t*0.5)
+        self._sway = ANIM.sin(time_s*5.5 + self.walk_t*2.0)
+        self._pulse = ANIM.sin(time_s*6.0)
     def _apply_mouse_lean(self, mouse_rel): pass
     def _aim_dir_from_lean(self):
-        x=self.facing; y=-math.sin(math.radians(self.spine_deg))
+        x=self.facing; y=-self._spine_sin()
         v=pygame.Vector2(x,y)
         return v if v.length()==0 else v.normalize()
     def _collide(self, vx, vy, plats):
@@ -357,36 +478,38 @@ class Humanoid(pygame.sprite.Sprite):
                 if vy>0: self.rect.bottom= p.rect.top; self.vel.y=0; self.on_ground=True
                 if vy<0: self.rect.top   = p.rect.bottom; self.vel.y=0
     def _pelvis_pos(self):
-        torso_y = 16 + HEAD_H + NECK_H + int(-math.sin(math.radians(self.spine_deg))*1)
+        torso_y = 16 + HEAD_H + NECK_H + int(-self._spine_sin()*1)
         pelvis_y = torso_y + TORSO_H
         return pygame.Vector2(32, pelvis_y)
     def _shoulders_pos(self):
-        torso_y = 16 + HEAD_H + NECK_H + int(-math.sin(math.radians(self.spine_deg))*1)
+        torso_y = 16 + HEAD_H + NECK_H + int(-self._spine_sin()*1)
         shoulder_y = torso_y + 6
         return pygame.Vector2(32, shoulder_y)
     def _head_center(self):
-        y = 16 + HEAD_H//2 + int(-math.sin(math.radians(self.spine_deg))*HEAD_BOB)
+        y = 16 + HEAD_H//2 + int(-self._spine_sin()*HEAD_BOB)
         return pygame.Vector2(32 + int(self.lean_vec.x*1.0), y)
     def _update_arms(self, time_s, right_hand_target=None):
+        self._sample_pose(time_s)
         if right_hand_target is None:
             dir = self._aim_dir_from_lean()
             dir_local = pygame.Vector2(dir.x*self.facing, dir.y)
             base_len = UP_ARM + LO_ARM - 4
-            target_len_r = base_len + (BOW_PULL if self.weapon=="bow" else 0) + math.sin(time_s*6.0)*ARM_SWAY*4
+            target_len_r = base_len + (BOW_PULL if self.weapon=="bow" else 0) + self._pulse*ARM_SWAY*4
             add = 0.0
             if self.weapon=="sword" and self.attack_phase>0:
-                add = math.radians(SWORD_SWING_DEG)*math.sin(self.attack_phase*math.pi)
-            tx = dir_local.x*target_len_r*math.cos(add) - dir_local.y*target_len_r*math.sin(add)
-            ty = dir_local.x*target_len_r*math.sin(add) + dir_local.y*target_len_r*math.cos(add) + ARM_GRAVITY
+                add = SWORD_SWING_RAD*ANIM.sin_cycle(self.attack_phase*0.5)
+            ca = ANIM.sin(add + math.pi/2); sa = ANIM.sin(add)
+            tx = dir_local.x*target_len_r*ca - dir_local.y*target_len_r*sa
+            ty = dir_local.x*target_len_r*sa + dir_local.y*target_len_r*ca + ARM_GRAVITY
         else:
             tx, ty = right_hand_target
         shoulders = self._shoulders_pos()
         r_shoulder = pygame.Vector2(shoulders.x + 8, shoulders.y)
         l_shoulder = pygame.Vector2(shoulders.x - 8, shoulders.y)
         self.r_arm.update(r_shoulder, pygame.Vector2(tx,ty), damp=ARM_DAMP)
-        sway = math.sin(time_s*5.5 + self.walk_t*2.0)*8
+        sway = self._sway*8
         lx = -8 + sway*0.2
-        ly = 6 + ARM_GRAVITY + abs(math.sin(self.walk_t*math.pi))*6
+        ly = 6 + ARM_GRAVITY + abs(self._walk_s1)*6
         if self.weapon=="sword" and getattr(self, "shield_active", False):
             tx, ty = (0, ARM_GRAVITY + 24)
             self.r_arm.update(r_shoulder, pygame.Vector2(tx, ty), damp=ARM_DAMP)
@@ -400,7 +523,7 @@ class Humanoid(pygame.sprite.Sprite):
         if self.facing<0: hand.x = self.image.get_width()-hand.x
         return pygame.Vector2(self.rect.left + hand.x, self.rect.top + hand.y)
     def _draw_leg(self, surf, hip, swing, knee_bend, color=(210,180,120)):
-        a1 = swing - 0.2*math.sin(self.walk_t*math.pi*2)
+        a1 = swing - 0.2*self._walk_s2
         knee = pygame.Vector2(hip.x + UP_LEG*math.sin(a1),
                               hip.y + UP_LEG*math.cos(a1))
         a2 = a1 + knee_bend
@@ -425,8 +548,8 @@ class Humanoid(pygame.sprite.Sprite):
         hip_r = pygame.Vector2(32+6, pelvis_pos.y+PELVIS_H-2)
         hip_l = pygame.Vector2(32-6, pelvis_pos.y+PELVIS_H-2)
         if not self.mounted:
-            a = math.sin(self.walk_t*math.pi*2)*0.5
-            knee_bend = 0.3 + 0.2*abs(math.sin(self.walk_t*math.pi*2))
+            a = self._walk_s2*0.5
+            knee_bend = 0.3 + 0.2*abs(self._walk_s2)
             self._draw_leg(surf, hip_r, a,   knee_bend, color=(210,180,120))
             self._draw_leg(surf, hip_l, -a,  knee_bend, color=(195,170,115))
         else:
@@ -504,6 +627,7 @@ class Player(Humanoid):
         self.shield_active = False
         # cooldown for touch-damage
         self.collide_cd = 0
+        self.damage_taken = 0
     def _apply_mouse_lean(self, mouse_rel):
         dx,dy = mouse_rel
         if dx>0.5: self.facing=1
@@ -539,10 +663,9 @@ class Player(Humanoid):
         # === Collision damage slow-down ===
         if self.collide_cd > 0:
             self.collide_cd -= 1
-        for e in enemies:
-            if self.rect.colliderect(e.rect) and self.collide_cd == 0:
-                self.take_damage(ENEMY_COLLIDE_TICK_DAMAGE)
-                self.collide_cd = FPS // 2  # only apply touch-damage twice per second
+        if self.collide_cd == 0 and broadphase.first(self.rect, "enemy"):
+            self.take_damage(ENEMY_COLLIDE_TICK_DAMAGE)
+            self.collide_cd = FPS // 2  # only apply touch-damage twice per second
 
         speed = abs(self.mount.vel.x) if self.mounted and self.mount else abs(self.vel.x)
         if speed>0.1 and (self.on_ground or (self.mounted and self.mount.on_ground)):
@@ -550,7 +673,6 @@ class Player(Humanoid):
         else:
             self.walk_t *= 0.96
         self._update_arms(time_s)
-        self._build_image(time_s)
     def sync_to_mount(self):
         if self.mounted and self.mount:
             seat = self.mount.seat_world()
@@ -558,9 +680,12 @@ class Player(Humanoid):
     def attack(self, bullets, enemies):
         if self.attack_cd>0: return
         if self.weapon=="sword":
-            for e in enemies:
+            reach = math.hypot(ATTACK_RANGE, 56)
+            for e, _ in list(proximity.within("enemy", self.rect.center, reach)):
                 if abs(e.rect.centerx - self.rect.centerx) < ATTACK_RANGE and abs(e.rect.centery - self.rect.centery) < 56:
-                    e.take_damage(40)
+                    particles.emit(e.rect.centerx - 10*self.facing, e.rect.centery, 24, SPARK_COLOR,
+                                   speed=(2, 6), life=(10, 22), angle=0 if self.facing > 0 else math.pi, spread=math.pi)
+                    e.take_damage(SWORD_DAMAGE)
             self.attack_cd=20
         elif self.weapon=="bow" and self.shoot_cd<=0:
             dir = self._aim_dir_from_lean()
@@ -572,6 +697,7 @@ class Player(Humanoid):
         if self.weapon != "sword":
             self.shield_active = False
     def take_damage(self,d):
+        self.damage_taken += min(d, self.health)
         self.health=max(0,self.health-d)
 
 class Bullet(pygame.sprite.Sprite):
@@ -583,30 +709,42 @@ class Bullet(pygame.sprite.Sprite):
         self.life=90
         self.is_enemy = is_enemy
     def update(self, plats, enemies, player):
+        start = self.rect.center
         self.rect.x += int(self.vel.x); self.rect.y += int(self.vel.y); self.life-=1
         if self.life<=0: self.kill()
+        # swept test along this tick's path first, so fast bullets can't skip thin
+        # platforms; the bullet stops at the wall, so only what's before it gets hit
+        wall = platform_grid.raycast(start, self.rect.center)
+        if wall: self.rect.center = wall[1]
         if self.is_enemy:
             if self.rect.colliderect(player.rect):
                 if getattr(player, 'shield_active', False):
+                    particles.emit(*self.rect.center, 12, SPARK_COLOR, speed=(1, 4), life=(8, 16))
                     self.kill()
                 else:
-                    player.take_damage(2); self.kill()   # was 30 → 15
+                    particles.emit(*self.rect.center, 10, BLOOD_COLOR, speed=(1, 3))
+                    player.take_damage(ENEMY_ARROW_DAMAGE); self.kill()   # was 30 → 15
         else:
-            hit = pygame.sprite.spritecollideany(self, enemies)
+            hit = broadphase.first(self.rect, "enemy")
             if hit:
-                hit.take_damage(28); self.kill()         # was 30 → 15
-        for t in plats:
-            if self.rect.colliderect(t.rect):
-                self.kill()
-                break
+                particles.emit(*self.rect.center, 14, BLOOD_COLOR, speed=(1, 3))
+                hit.take_damage(ARROW_DAMAGE); self.kill()         # was 30 → 15
+        if wall and self.alive():
+            particles.emit(*wall[1], 10, DUST_COLOR, speed=(0.5, 2.5), life=(12, 26),
+                           angle=math.atan2(-self.vel.y, -self.vel.x), spread=math.pi*0.8, weight=0.4)
+            self.kill()
 
 class Enemy(Humanoid):
+    POSE_TINT = (110, 150, 110)
     def __init__(self,x,y):
         super().__init__(x,y)
         self.health = 80
         self.weapon="bow"
         self.shoot_cd = random.randint(0, ENEMY_SHOOT_CD)
         self.attack_cd = 0
+        # AIScheduler bookkeeping (tick of next/last think)
+        self.ai_next = None
+        self.ai_last = 0
     def _aim_towards_player(self, player):
         dir_vec = pygame.Vector2(player.rect.centerx - self.rect.centerx, player.rect.centery - self.rect.centery)
         if dir_vec.length() == 0: dir_vec.update(1,0)
@@ -625,12 +763,18 @@ class Enemy(Humanoid):
             self.walk_t += (speed/ENEMY_SPEED)*WALK_FREQ*(1/FPS)
         else:
             self.walk_t *= 0.96
+        self._aim_towards_player(player)
+        self._update_arms(time_s)
+
+    def think(self, player, bullets, ticks=1):
+        # targeting/weapon/attack decisions; run by AIScheduler, `ticks` since last think
         dist = pygame.Vector2(player.rect.center).distance_to(self.rect.center)
         if dist > RANGED_DIST: self.weapon = "bow"
         elif dist < MELEE_DIST: self.weapon = "sword"
         if self.weapon=="bow":
-            if self.shoot_cd>0: self.shoot_cd-=1
-            if self.shoot_cd<=0:
+            if self.shoot_cd>0: self.shoot_cd = max(0, self.shoot_cd - ticks)
+            if self.shoot_cd<=0 and (not ENEMY_LOS_CHECK or
+                    platform_grid.line_of_sight(self._hand_world(), player.rect.center)):
                 self._aim_towards_player(player)
                 dir_vec = pygame.Vector2(player.rect.centerx - self.rect.centerx, player.rect.centery - self.rect.centery)
                 if dir_vec.length() == 0: dir_vec.update(1,0)
@@ -641,20 +785,19 @@ class Enemy(Humanoid):
                 self.attack_phase = 0.5
         else:
             if self.attack_cd>0:
-                self.attack_cd -= 1
+                self.attack_cd = max(0, self.attack_cd - ticks)
                 self.attack_phase = 1.0 - (self.attack_cd/20.0)
             else:
                 if abs(player.rect.centerx - self.rect.centerx) < ATTACK_RANGE and abs(player.rect.centery - self.rect.centery) < 56:
-                    player.take_damage(40) if not getattr(player, 'shield_active', False) else None
+                    player.take_damage(ENEMY_SWORD_DAMAGE) if not getattr(player, 'shield_active', False) else None
                     self.attack_cd = ENEMY_SWING_CD
                     self.attack_phase = 0.5
-        self._aim_towards_player(player)
-        self._update_arms(time_s)
-        self._build_image(time_s, tint=(110, 150, 110))
 
     def take_damage(self, d):
         self.health = max(0, self.health - d)
         if self.health <= 0:
+            if self.alive():
+                particles.emit(*self.rect.center, 80, DEATH_COLOR, speed=(1, 5), life=(25, 50), weight=0.6)
             self.kill()
 
 # ----- level -----
@@ -664,32 +807,51 @@ enemies = pygame.sprite.Group()
 bullets = pygame.sprite.Group()
 all_sprites = pygame.sprite.Group()
 mounts = pygame.sprite.Group()
-
-ground = Platform(0, LEVEL_H-80, LEVEL_W, 80); plats.add(ground); all_sprites.add(ground)
-player = Player(120, LEVEL_H-320); all_sprites.add(player)
+lanterns = pygame.sprite.Group()
 
 HORSE_START_X, HORSE_START_Y = 420, LEVEL_H-320
-horse = Horse(HORSE_START_X, HORSE_START_Y)
-mounts.add(horse); all_sprites.add(horse)
-
 enemy_positions = [
     (600, LEVEL_H-256),(760, LEVEL_H-256),(920, LEVEL_H-256),
     (1150, LEVEL_H-256),(1350, LEVEL_H-256),
     (1600, LEVEL_H-256),(1800, LEVEL_H-256),
     (2050, LEVEL_H-256),(2300, LEVEL_H-256),(2500, LEVEL_H-256)
 ]
-for pos in enemy_positions:
-    e=Enemy(pos[0],pos[1]); enemies.add(e); all_sprites.add(e)
 
-cam = Camera(LEVEL_W, LEVEL_H)
+# level objects are built on first use (ensure_level), not at import
+ground = player = horse = cam = None
+platform_grid = PlatformGrid()
+
+def build_level():
+    global ground, player, horse, cam
+    ground = Platform(0, LEVEL_H-80, LEVEL_W, 80); plats.add(ground); all_sprites.add(ground)
+    player = Player(120, LEVEL_H-320); all_sprites.add(player)
+    horse = Horse(HORSE_START_X, HORSE_START_Y)
+    mounts.add(horse); all_sprites.add(horse)
+    for lx in range(300, LEVEL_W, LANTERN_SPACING):
+        ln = Lantern(lx, ground.rect.top); lanterns.add(ln); all_sprites.add(ln)
+    for pos in enemy_positions:
+        e=Enemy(pos[0],pos[1]); enemies.add(e); all_sprites.add(e)
+    cam = Camera(LEVEL_W, LEVEL_H)
+    # static platform grid for bullet sweeps and enemy line of sight
+    platform_grid.build(plats)
+    sync_spatial()
+
+def ensure_level():
+    if player is None: build_level()
+
+# x-axis broadphase over the enemies (bullet hits, player touch damage),
+# hash grid for radius lookups (melee, mount prompts)
+broadphase = SweepAndPrune()
+AI_BUDGET = AI_BUDGET_MS      # ms of AI per frame; None = no wall-clock cap (sweep.py, game_env.py)
+ai_scheduler = AIScheduler(budget_ms=AI_BUDGET)
+proximity = ProximityGrid()
+def sync_spatial():
+    broadphase.sync(enemy=enemies)
+    proximity.sync(horse=mounts, enemy=enemies)
 
 def nearest_mount_and_dist(player, mounts):
-    best=None; best_d=1e9
-    for h in mounts:
-        seat = h.seat_world()
-        d = pygame.Vector2(player.rect.center).distance_to(seat)
-        if d<best_d: best_d=d; best=h
-    return best, best_d
+    best, best_d = proximity.nearest("horse", player.rect.center, MOUNT_QUERY_R, pos=Horse.seat_world)
+    return best, (best_d if best else 1e9)
 
 def can_mount(player, horse):
     seat = horse.seat_world()
@@ -697,17 +859,31 @@ def can_mount(player, horse):
     near_rect = horse.rect.inflate(80,40).colliderect(player.rect)
     return dist <= MOUNT_RANGE or near_rect, dist
 
+lightmap = LightMap()
+particles = ParticleSystem()
+weather = Weather()
+def frame_lights():
+    # screen-space lights for this frame: player, lanterns, bullets
+    off = cam.offset
+    r, c = PLAYER_LIGHT
+    lights = [(player.rect.centerx - off.x, player.rect.centery - off.y, r, c)]
+    for ln in lanterns: lights.append(ln.light(off))
+    for b in bullets:
+        r, c = ENEMY_BULLET_LIGHT if b.is_enemy else ARROW_LIGHT
+        lights.append((b.rect.centerx - off.x, b.rect.centery - off.y, r, c))
+    return lights
+
 def draw_hud(surf, pl):
     bar_w=220; x,y=12,12
     pygame.draw.rect(surf,(60,60,70),(x-2,y-2,bar_w+4,24))
     pygame.draw.rect(surf,(120,30,30),(x,y,int(bar_w*(pl.health/100)),20))
-    surf.blit(font.render(f"Health: {pl.health}",True,WHITE),(x+6,y+24))
-    surf.blit(font.render(f"Weapon: {pl.weapon.title()}",True,WHITE),(x+6,y+48))
+    surf.blit(get_font(18).render(f"Health: {pl.health}",True,WHITE),(x+6,y+24))
+    surf.blit(get_font(18).render(f"Weapon: {pl.weapon.title()}",True,WHITE),(x+6,y+48))
 
     # Mount hint (only when near a horse)
     mount_hint = ""
     near_any = False
-    for h in mounts:
+    for h, _ in proximity.within("horse", pl.rect.center, MOUNT_QUERY_R, pos=Horse.seat_world):
         ok, dist = can_mount(pl, h)
         if ok:
             mount_hint = f"Press E to mount horse (dist: {int(dist)})"
@@ -717,23 +893,110 @@ def draw_hud(surf, pl):
         mount_hint = "Mounted: Horse (E to dismount)"
         near_any = True
     if near_any:
-        surf.blit(font.render(mount_hint,True,WHITE),(x+6,y+72))
+        surf.blit(get_font(18).render(mount_hint,True,WHITE),(x+6,y+72))
+
+    # frame pacing stats (F8 toggles; on by default with --pacing)
+    if SHOW_PACING and pacer:
+        mean, std, worst, cpu = pacer.stats()
+        txt = f"{pacer.mode}: {mean:.2f} ms  jitter {std:.2f}  worst {worst:.1f}  cpu {cpu*100:.0f}%"
+        surf.blit(get_font(18).render(txt,True,WHITE),(x, HEIGHT-24))
 
-running=True
 last_switch=-1000; SWITCH_MS=120
 last_mount_toggle=-1000
-pygame.mouse.get_rel()
-
 game_over = False
-
 game_won = False
 
+def restart_game():
+    # fresh player, horse and AI schedule: no cooldowns, pose or AI stagger
+    # carry over, so a restart (or a sweep job) replays exactly
+    global game_over, game_won, player, horse, ai_scheduler
+    ensure_level()
+    game_over = False
+    game_won = False
+    player.kill(); horse.kill()
+    player = Player(120, LEVEL_H-320); all_sprites.add(player)
+    horse = Horse(HORSE_START_X, HORSE_START_Y)
+    mounts.add(horse); all_sprites.add(horse)
+    ai_scheduler = AIScheduler(budget_ms=AI_BUDGET)
+    bullets.empty()
+    particles.clear()
+    for e in enemies: e.kill()
+    for pos in enemy_positions:
+        e=Enemy(pos[0],pos[1]); enemies.add(e); all_sprites.add(e)
+    sync_spatial()
+
+def handle_action(act, now):
+    # one-shot inputs, from events (run) or from a script/replay (sweep.py)
+    global last_switch, last_mount_toggle
+    if act == "restart":
+        if game_over or game_won:
+            restart_game()
+            pygame.mouse.get_rel()
+        return
+    if game_over or game_won: return
+    if act == "attack":
+        player.shield_active = False
+        player.attack(bullets,enemies)
+    elif act == "shield":
+        if player.weapon == "sword":
+            player.shield_active = True
+    elif act == "switch":
+        if now-last_switch>SWITCH_MS: player.switch_weapon(); last_switch=now
+    elif act == "mount":
+        if now - last_mount_toggle > MOUNT_COOLDOWN_MS:
+            if player.mounted:
+                player.mounted=False
+                if player.mount:
+                    player.mount.rider=None
+                    player.rect.midbottom = (player.mount.rect.centerx + (20 if player.facing>0 else -20),
+                                             player.mount.rect.bottom)
+                    player.mount=None
+            else:
+                best, dist = nearest_mount_and_dist(player, mounts)
+                if best:
+                    ok, _ = can_mount(player, best)
+                    if ok:
+                        player.mounted=True; player.mount=best; best.rider=player
+                        seat = best.seat_world()
+                        player.rect.midbottom = (int(seat.x), int(seat.y + 24))
+            last_mount_toggle = now
+
+def event_action(ev):
+    if not game_over and not game_won:
+        if ev.type==MOUSEBUTTONDOWN and ev.button==1: return "attack"
+        if ev.type==MOUSEBUTTONDOWN and ev.button in (2,3): return "shield"
+        if ev.type==MOUSEWHEEL:
+            dy=getattr(ev,"precise_y",ev.y)
+            if abs(dy)>0.02: return "switch"
+        if ev.type==KEYDOWN and ev.key==K_e: return "mount"
+    elif ev.type==KEYDOWN and ev.key==K_RETURN:
+        return "restart"
+    return None
+
+def step_world(keys, mouse_rel, t):
+    # one simulation tick (no drawing)
+    global game_over, game_won
+    if game_over or game_won: return
+    player.update(plats, bullets, enemies, mouse_rel, t, keys, mounts)
+    for h in mounts: h.update(plats)
+    player.sync_to_mount()
+    bullets.update(plats, enemies, player)
+    for e in enemies: e.update(plats, bullets, player, t)
+    ai_scheduler.run(enemies, player, bullets)
+    particles.update()
+    sync_spatial()
+    if player.health <= 0:
+        game_over = True
+    # Win check
+    if not game_over and len(enemies) == 0:
+        game_won = True
+
 def draw_game_over_overlay():
     overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
     overlay.fill((0,0,0,160))
     title_text = "game over, press enter button to start again"
-    big = pygame.font.SysFont("", 36)
-    small = pygame.font.SysFont("", 22)
+    big = get_font(36)
+    small = get_font(22)
     tsurf = big.render(title_text, True, (255,255,255))
     hint = small.render("Press ESC to quit", True, (200,200,200))
     overlay.blit(tsurf, (WIDTH//2 - tsurf.get_width()//2, HEIGHT//2 - tsurf.get_height()))
@@ -744,103 +1007,281 @@ def draw_game_over_overlay():
 def draw_win_overlay():
     overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
     overlay.fill((0,0,0,160))
-    big = pygame.font.SysFont("", 44)
-    small = pygame.font.SysFont("", 22)
+    big = get_font(44)
+    small = get_font(22)
     tsurf = big.render("YOU WIN", True, (255, 255, 0))
     hint = small.render("Press ENTER to restart", True, (220,220,220))
     overlay.blit(tsurf, (WIDTH//2 - tsurf.get_width()//2, HEIGHT//2 - tsurf.get_height()))
     overlay.blit(hint,  (WIDTH//2 - hint.get_width()//2, HEIGHT//2 + 24))
     screen.blit(overlay, (0,0))
 
-while running:
-    dt=clock.tick(FPS); now=pygame.time.get_ticks(); t=now/1000.0
-    mouse_rel=(0,0)
-    keys = pygame.key.get_pressed()
-    for ev in pygame.event.get():
-        if ev.type==QUIT or (ev.type==KEYDOWN and ev.key==K_ESCAPE): running=False
-        if not game_over and not game_won:
-            if ev.type==MOUSEBUTTONDOWN and ev.button==1:
-                player.shield_active = False
-                player.attack(bullets,enemies)
-            if ev.type==MOUSEBUTTONDOWN and ev.button in (2,3):
-                if player.weapon == "sword":
-                    player.shield_active = True
-            if ev.type==MOUSEWHEEL:
-                dy=getattr(ev,"precise_y",ev.y)
-                if abs(dy)>0.02 and now-last_switch>SWITCH_MS: player.switch_weapon(); last_switch=now
-            if ev.type==MOUSEMOTION: mouse_rel = ev.rel
-            if ev.type==KEYDOWN and ev.key==K_e:
-                if now - last_mount_toggle > MOUNT_COOLDOWN_MS:
-                    if player.mounted:
-                        player.mounted=False
-                        if player.mount:
-                            player.mount.rider=None
-                            player.rect.midbottom = (player.mount.rect.centerx + (20 if player.facing>0 else -20),
-                                                     player.mount.rect.bottom)
-                            player.mount=None
-                    else:
-                        best, dist = nearest_mount_and_dist(player, mounts)
-                        if best:
-                            ok, _ = can_mount(player, best)
-                            if ok:
-                                player.mounted=True; player.mount=best; best.rider=player
-                                seat = best.seat_world()
-                                player.rect.midbottom = (int(seat.x), int(seat.y + 24))
-                    last_mount_toggle = now
-        else:
-            if ev.type==KEYDOWN and ev.key==K_RETURN:
-                game_over = False
-
-                player.health = 100
-                if player.mounted and player.mount:
-                    player.mount.rider=None
-                player.mounted=False; player.mount=None
-                player.rect.topleft = (120, LEVEL_H-320)
-                player.vel.update(0,0)
-                # Reset horse
-                for h in mounts:
-                    h.rider = None
-                    h.rect.topleft = (HORSE_START_X, HORSE_START_Y)
-                    h.vel.update(0,0)
-                    h.on_ground = False
-                bullets.empty()
-                for e in enemies: e.kill()
-                for pos in enemy_positions:
-                    e=Enemy(pos[0],pos[1]); enemies.add(e); all_sprites.add(e)
-                pygame.mouse.get_rel()
-
-    if mouse_rel==(0,0): mouse_rel = pygame.mouse.get_rel()
-
-    if not game_over and not game_won:
-        player.update(plats, bullets, enemies, mouse_rel, t, keys, mounts)
-        for h in mounts: h.update(plats)
-        player.sync_to_mount()
-        bullets.update(plats, enemies, player)
-        for e in enemies: e.update(plats, bullets, player, t)
-        if player.health <= 0:
-            game_over = True
-        # Win check
-        if not game_over and len(enemies) == 0:
-            game_won = True
+def day_frac(t):
+    return (math.sin(t * 0.35) + 1) / 2
 
+def draw_background(surface, t, offset_x):
+    # animated background layers; runs on the bg-render thread when PIPELINED_BG
+    time_angle = t * 0.35
+    t_frac = day_frac(t)
+    sky_color = get_sky_color(t_frac)
+    sun_y = HEIGHT*0.5 - math.sin(time_angle) * (HEIGHT*0.39)
+    moon_y = HEIGHT*0.5 + math.sin(time_angle) * (HEIGHT*0.39)
+    move_clouds_bg(surface)
+    draw_scene_bg(surface, sky_color, sun_y, moon_y, t_frac, offset_x)
+
+pose_pool = PosePool(POSE_WORKERS)
+
+# ----- startup loading (worker thread; see loader.py) -----
+def warm_caches():
+    # cloud and light sprites the first frames ask for, rain and snow textures
+    ensure_bg_init(pygame.Surface((WIDTH, HEIGHT)))
+    for c in clouds: cloud_sprites.get(c["size"], c.get("variant", 0))
+    for r, c in (PLAYER_LIGHT, ARROW_LIGHT, ENEMY_BULLET_LIGHT, LANTERN_LIGHT): lightmap.light_sprite(r, c)
+    weather.warm((WIDTH, HEIGHT))
+
+def convert_caches():
+    # main thread, after loading: the worker baked plain SRCALPHA surfaces
+    cloud_sprites.convert_all()
+    weather.convert_all()
+
+def load_tasks():
+    # the game draws no image files yet (asset_cache.py compiles them for when it does)
+    return [("level", ensure_level), ("caches", warm_caches)]
+
+def load_startup():
+    # False if the window was closed while loading
+    loader = Loader(load_tasks())
+    if not run_loading_screen(loader, screen, get_font(22)): return False, loader
+    convert_caches()
+    return True, loader
+def render_poses(t):
+    # pose stage: rasterize the humanoids in view (others keep their last image)
+    if not RENDER_POSES: return
+    view = pygame.Rect(cam.offset.x, cam.offset.y, WIDTH, HEIGHT).inflate(POSE_VIEW_PAD*2, POSE_VIEW_PAD*2)
+    pose_pool.rasterize([h for h in (player, *enemies) if h.rect.colliderect(view)], t)
+
+def render_frame(t, bg=None):
+    # bg: finished background from BackgroundPipeline, else it is drawn here
+    global bg_offset_x
     follow_rect = player.mount.rect if (player.mounted and player.mount) else player.rect
     cam.update(follow_rect)
+    render_poses(t)
 
     # Draw animated background
     bg_offset_x = cam.offset.x
-
-    time_angle = t * 0.35
-    t_frac = (math.sin(time_angle) + 1) / 2
-    sky_color = get_sky_color(t_frac)
-    sun_y = HEIGHT*0.5 - math.sin(time_angle) * (HEIGHT*0.39)
-    moon_y = HEIGHT*0.5 + math.sin(time_angle) * (HEIGHT*0.39)
-    move_clouds_bg(screen)
-    draw_scene_bg(screen, sky_color, sun_y, moon_y, t_frac)
+    t_frac = day_frac(t)
+    if bg is not None: screen.blit(bg, (0, 0))
+    else: draw_background(screen, t, bg_offset_x)
     for s in all_sprites: screen.blit(s.image, cam.apply(s.rect))
     for b in bullets: screen.blit(b.image, cam.apply(b.rect))
+    weather.draw(screen, t, bg_offset_x)
+    lightmap.render(screen, t_frac, frame_lights())
+    particles.draw(screen, cam.offset)
     draw_hud(screen, player)
     if game_over: draw_game_over_overlay()
     if game_won: draw_win_overlay()
-    pygame.display.flip()
 
-pygame.quit()
+# per-frame telemetry (telemetry.py); F9 writes the buffer, --telemetry PATH also on exit
+TELEMETRY_FIELDS = ("frame", "t", "dt_ms", "input_ms", "sim_ms", "render_ms", "flip_ms",
+                    "enemies", "bullets", "sprites", "particles", "ai_thinks", "ai_deferred", "poses",
+                    "sky_hit", "cloud_hit", "light_hit", "rss_mb", "gc_ms", "jitter_ms", "worst_ms", "pace_cpu")
+TELEMETRY_MEM_EVERY = 30       # frames between RSS samples
+telemetry = Telemetry(TELEMETRY_FIELDS, meta={"fps": FPS, "level_w": LEVEL_W})
+
+def telemetry_path():
+    return time.strftime("telemetry-%Y%m%d-%H%M%S.jsonl")
+
+# F10 (or --profile-frames N) profiles the next N loop iterations (frame_profiler.py)
+frame_profiler = FrameProfiler()
+
+# frame pacing (pacing.py): sleep | busy | hybrid | vsync
+PACING = "sleep"
+SHOW_PACING = False
+pacer = None
+
+# GC pauses per frame (gc_monitor.py); --gc-freeze / --gc-idle remove them
+gc_monitor = GCMonitor()
+
+# --trace PATH: Chrome trace-event zones (trace_events.py); nothing is wrapped otherwise
+tracer = None
+
+def enable_tracing():
+    global tracer
+    tracer = Tracer()
+    for cls in (Player, Enemy, Bullet): tracer.wrap(cls, "update")
+    tracer.wrap(Humanoid, "_build_image")
+    game = sys.modules[__name__]
+    for fn in ("step_world", "render_frame", "draw_scene_bg", "draw_hud"): tracer.wrap(game, fn)
+    tracer.wrap(AIScheduler, "run")
+    tracer.wrap(pygame.display, "flip", "display.flip")
+
+# --mem-report SECONDS: tracemalloc snapshots at load and after SECONDS of play (mem_report.py)
+mem_report = None
+MEM_SUBSYSTEMS = {
+    "Humanoid": "humanoids", "Player": "humanoids", "Enemy": "humanoids", "IKArm": "humanoids",
+    "AnimSampler": "humanoids", "pose_pool.py": "humanoids",
+    "Bullet": "bullets", "Horse": "horse",
+    "Platform": "level", "Lantern": "level", "build_level": "level", "restart_game": "level",
+    "draw_scene_bg": "background", "ensure_bg_init": "background", "draw_background": "background",
+    "bg_cache.py": "background", "weather.py": "background", "bg_worker.py": "background",
+    "draw_hud": "hud", "get_font": "hud", "draw_game_over_overlay": "hud", "draw_win_overlay": "hud",
+    "lighting.py": "lighting", "particles.py": "particles", "spatial.py": "spatial",
+    "ai_scheduler.py": "ai", "loader.py": "loading",
+    "telemetry.py": "telemetry",
+}
+
+def mem_owners():
+    # surfaces per entity type / cache, for the pixel-memory table
+    return {"Player": [player], "Enemy": enemies, "Horse": mounts, "Bullet": bullets, "Platform": plats,
+            "Lantern": lanterns, "background": [sky_gradient, cloud_sprites, weather], "lighting": [lightmap],
+            "display": [screen]}
+
+def run(record_path=None, max_frames=None, on_first_frame=None, telemetry_out=None, profile_frames=None,
+        trace_out=None, hitch_log=None, mem_report_after=None, pacing=None):
+    global pacer, SHOW_PACING
+    ensure_level()
+    pacer = FramePacer(pacing or PACING, FPS, clock)
+    profile_n = profile_frames or PROFILE_FRAMES
+    gc_monitor.install()
+    # frames over HITCH_MULT x budget get main-thread stack samples (hitch.py)
+    watchdog = HitchWatchdog(HITCH_MULT*1000.0/FPS, log_path=hitch_log) if hitch_log else None
+    if profile_frames: frame_profiler.request(profile_frames)
+    recorder = InputRecorder(record_path) if record_path else None
+    flush_path = telemetry_out
+    mem = rss_mb()
+    # camera x lags the sim by a frame for the pipelined background (parallax <= 0.5)
+    bg_pipe = BackgroundPipeline(draw_background) if PIPELINED_BG else None
+    pygame.mouse.get_rel()
+    # game clock in ms from the loop start (get_ticks() needs the timer subsystem)
+    t_loop = time.perf_counter()
+    frames = 0
+    running=True
+    t_prev = time.perf_counter()
+    while running:
+        if tracer: tracer.mark(f"frame {frames}")
+        gc_monitor.begin_frame(frames)
+        pacer.wait()
+        if pacer.fell_back: print("vsync: flip does not block on this display; pacing falls back to sleep"); pacer.fell_back = False
+        frame_profiler.frame_begin()
+        t0 = time.perf_counter(); frame_ms = (t0 - t_prev)*1000; t_prev = t0
+        now=int((t0-t_loop)*1000); t=now/1000.0
+        if watchdog: watchdog.frame_start(frames)
+        mouse_rel=(0,0)
+        keys = pygame.key.get_pressed()
+        actions = []
+        for ev in pygame.event.get():
+            if ev.type==QUIT or (ev.type==KEYDOWN and ev.key==K_ESCAPE): running=False
+            if ev.type==MOUSEMOTION and not game_over and not game_won: mouse_rel = ev.rel
+            if ev.type==KEYDOWN and ev.key==K_F9:
+                flush_path = flush_path or telemetry_path()
+                print(f"telemetry: {telemetry.flush(flush_path)} frames -> {flush_path}")
+            if ev.type==KEYDOWN and ev.key==K_F10: frame_profiler.request(profile_n)
+            if ev.type==KEYDOWN and ev.key==K_F8: SHOW_PACING = not SHOW_PACING
+            act = event_action(ev)
+            if act:
+                handle_action(act, now); actions.append(act)
+
+        if mouse_rel==(0,0): mouse_rel = pygame.mouse.get_rel()
+        if recorder: recorder.record(keys, mouse_rel, actions)
+
+        if bg_pipe: bg_pipe.submit(screen.get_size(), t, cam.offset.x)
+        t1 = time.perf_counter()
+        step_world(keys, mouse_rel, t)
+        t2 = time.perf_counter()
+        render_frame(t, bg_pipe.wait() if bg_pipe else None)
+        t3 = time.perf_counter()
+        pygame.display.flip()
+        t4 = time.perf_counter()
+        if watchdog:
+            hitch = watchdog.frame_end({"enemies": len(enemies), "bullets": len(bullets), "particles": particles.n,
+                                        "sprites": len(all_sprites), "gc_ms": round(gc_monitor.frame_ms, 2)})
+            if hitch: print(f"hitch: frame {hitch['frame']} took {hitch['ms']:.1f} ms")
+        gc_monitor.collect_idle(1000.0/FPS - (t4 - t0)*1000)
+        if frames % TELEMETRY_MEM_EVERY == 0: mem = rss_mb()
+        _, jitter, worst, pace_cpu = pacer.stats()
+        telemetry.record((frames, t, frame_ms, (t1-t0)*1000, (t2-t1)*1000, (t3-t2)*1000, (t4-t3)*1000,
+                          len(enemies), len(bullets), len(all_sprites), particles.n,
+                          ai_scheduler.thinks, ai_scheduler.deferred, pose_pool.built,
+                          hit_rate(sky_gradient), hit_rate(cloud_sprites), hit_rate(lightmap), mem,
+                          gc_monitor.frame_ms, jitter, worst, pace_cpu))
+        if frame_profiler.active:
+            out = frame_profiler.frame_end({"e": len(enemies), "b": len(bullets), "p": particles.n})
+            if out: print(f"profile: {profile_n} frames -> {out}")
+        frames += 1
+        if frames == 1 and on_first_frame: on_first_frame()
+        if mem_report and mem_report_after is not None and t >= mem_report_after:
+            mem_report.snapshot("play"); print(mem_report.report(mem_owners()))
+            mem_report_after = None
+        if max_frames and frames >= max_frames: running=False
+
+    frame_profiler.stop()
+    # before the pools close, so their thread names are still known
+    if tracer and trace_out: print(f"trace: {tracer.save(trace_out)} events -> {trace_out}")
+    if bg_pipe: bg_pipe.close()
+    pose_pool.close()
+    if recorder: recorder.close()
+    if telemetry_out: telemetry.flush(telemetry_out)
+    gc_monitor.uninstall()
+    if watchdog: watchdog.close(); print(watchdog.report())
+    pygame.quit()
+
+def main(argv=None):
+    global PIPELINED_BG, pose_pool, mem_report, SHOW_PACING
+    import argparse
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--record-input", metavar="PATH", help="write per-tick input as JSONL (replay with sweep.py --policy PATH)")
+    ap.add_argument("--pipelined-bg", action="store_true", help="render the background on a worker thread")
+    ap.add_argument("--pose-workers", type=int, help=f"threads for pose rasterization (default {POSE_WORKERS}, 1 = inline)")
+    ap.add_argument("--startup-report", action="store_true", help="print cold-start timings (import, init, font, level, first frame)")
+    ap.add_argument("--frames", type=int, metavar="N", help="quit after N frames")
+    ap.add_argument("--profile-frames", type=int, metavar="N", help=f"cProfile the first N frames (F10 profiles the next N, default {PROFILE_FRAMES})")
+    ap.add_argument("--gc-stats", action="store_true", help="print garbage collector pauses on exit")
+    ap.add_argument("--gc-freeze", action="store_true", help="gc.freeze() everything alive after loading")
+    ap.add_argument("--gc-idle", action="store_true", help="collect only at the end of frames with time to spare")
+    ap.add_argument("--hitch-log", metavar="PATH", help=f"log frames over {HITCH_MULT:g}x budget with main-thread stack samples (JSONL)")
+    ap.add_argument("--mem-report", type=float, metavar="SECONDS", help="tracemalloc memory report per subsystem after SECONDS of play")
+    ap.add_argument("--pacing", choices=PACING_MODES, help=f"frame pacing (default {PACING}); shows jitter stats (F8)")
+    ap.add_argument("--trace", metavar="PATH", help="write Chrome trace-event JSON of the frame phases on exit")
+    ap.add_argument("--telemetry", metavar="PATH", help="write per-frame telemetry as JSONL on exit (F9 writes any time)")
+    args = ap.parse_args(argv)
+    PIPELINED_BG = PIPELINED_BG or args.pipelined_bg
+    if args.pose_workers is not None: pose_pool.close(); pose_pool = PosePool(args.pose_workers)
+    if args.trace: enable_tracing()
+    pacing = args.pacing or PACING
+    SHOW_PACING = SHOW_PACING or args.pacing is not None
+
+    marks = [("import", _T_IMPORT, _T_READY)]
+    def mark(name, fn):
+        t0 = time.perf_counter(); fn(); marks.append((name, t0, time.perf_counter()))
+    def init():
+        nonlocal pacing
+        if not init_display(vsync=pacing == "vsync"):
+            print("vsync not available with this display driver; pacing falls back to sleep")
+            pacing = "sleep"
+    mark("init", init)
+    mark("font", lambda: get_font(18))
+    if args.mem_report is not None:
+        mem_report = MemReport(__file__, MEM_SUBSYSTEMS)
+        mem_report.start()
+    t0 = time.perf_counter()
+    ok, loader = load_startup()
+    marks.append(("load", t0, time.perf_counter()))
+    if not ok: pygame.quit(); return
+    if mem_report: mem_report.snapshot("load")
+    if args.gc_freeze: gc_monitor.freeze()
+    if args.gc_idle: gc_monitor.enable_idle()
+    t_loop = time.perf_counter()
+    def first_frame():
+        marks.append(("first frame", t_loop, time.perf_counter()))
+        if args.startup_report:
+            for name, a, b in marks: print(f"{name:>12}: {(b-a)*1000:7.1f} ms")
+            for label, dt in loader.timings.items(): print(f"{'':>14}{label}: {dt*1000:.1f} ms")
+            print(f"{'total':>12}: {(time.perf_counter()-_T_IMPORT)*1000:7.1f} ms")
+    run(record_path=args.record_input, max_frames=args.frames, on_first_frame=first_frame,
+        telemetry_out=args.telemetry, profile_frames=args.profile_frames, trace_out=args.trace,
+        hitch_log=args.hitch_log, mem_report_after=args.mem_report, pacing=pacing)
+    if args.gc_stats: print(gc_monitor.report())
+
+_T_READY = time.perf_counter()
+
+if __name__ == "__main__":
+    main()
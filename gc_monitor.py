@@ -0,0 +1,84 @@
+# ==== Garbage collector pauses ====
+# GCMonitor hooks gc.callbacks and logs every collection (generation,
+# duration, objects collected) against the frame it ran in, so frame spikes
+# can be told apart from GC pauses. Two ways to get rid of them:
+#   freeze()       after loading: moves everything alive into the permanent
+#                  generation, so collections stop re-scanning the level
+#   enable_idle()  turns automatic collection off; collect_idle() then runs
+#                  the due generation at the end of a frame when the time
+#                  left before the next frame covers its usual cost
+import gc, time
+
+GC_LOG_MAX = 10000             # collections kept for the report
+GC_REPORT_MS = 1.0             # collections at least this long are listed
+IDLE_FORCE_MULT = 8            # collect anyway once gen0 is this far over threshold
+
+
+class GCMonitor:
+    def __init__(self):
+        self.log = []           # (frame, generation, ms, collected, idle)
+        self.frame = 0
+        self.frame_ms = 0.0     # GC time in the current frame
+        self.idle = False
+        self.cost = [0.05, 0.3, 5.0]    # running estimate of ms per collection, per generation
+        self._in_idle = False
+        self._t = 0.0
+
+    def install(self):
+        if self._cb not in gc.callbacks: gc.callbacks.append(self._cb)
+
+    def uninstall(self):
+        if self._cb in gc.callbacks: gc.callbacks.remove(self._cb)
+        if self.idle: gc.enable(); self.idle = False
+
+    def _cb(self, phase, info):
+        if phase == "start":
+            self._t = time.perf_counter()
+            return
+        ms = (time.perf_counter() - self._t)*1000
+        gen = info["generation"]
+        self.frame_ms += ms
+        self.cost[gen] += (ms - self.cost[gen])*0.2
+        if len(self.log) < GC_LOG_MAX:
+            self.log.append((self.frame, gen, ms, info["collected"], self._in_idle))
+
+    def begin_frame(self, n):
+        self.frame = n
+        self.frame_ms = 0.0
+
+    def freeze(self):
+        gc.collect()
+        gc.freeze()
+
+    def enable_idle(self):
+        gc.disable()
+        self.idle = True
+
+    def collect_idle(self, slack_ms):
+        # end of frame: run the due generation if it fits in slack_ms
+        if not self.idle: return
+        t0, t1, t2 = gc.get_threshold()
+        c0, c1, c2 = gc.get_count()
+        if c0 < t0: return
+        gen = 2 if c1 >= t1 and c2 >= t2 else 1 if c1 >= t1 else 0
+        if self.cost[gen] <= slack_ms or c0 >= t0*IDLE_FORCE_MULT:
+            self._in_idle = True
+            try: gc.collect(gen)
+            finally: self._in_idle = False
+
+    def report(self):
+        lines = []
+        for gen in range(3):
+            ms = [e[2] for e in self.log if e[1] == gen]
+            if ms:
+                lines.append(f"gen{gen}: {len(ms)} collections, {sum(ms):.1f} ms total, max {max(ms):.2f} ms")
+        gc_frames = {}
+        for f, _, ms, _, idle in self.log:
+            if not idle: gc_frames[f] = gc_frames.get(f, 0.0) + ms
+        spikes = sorted((ms, f) for f, ms in gc_frames.items() if ms >= GC_REPORT_MS)
+        if spikes:
+            lines.append(f"frames with >= {GC_REPORT_MS} ms of in-frame GC: "
+                         + ", ".join(f"{f} ({ms:.1f} ms)" for ms, f in reversed(spikes[-10:])))
+        idle = [e[2] for e in self.log if e[4]]
+        if idle: lines.append(f"idle-time collections: {len(idle)}, {sum(idle):.1f} ms")
+        return "\n".join(lines) or "no collections"
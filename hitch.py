@@ -0,0 +1,90 @@
+# ==== Hitch detector ====
+# A watchdog thread follows the main loop's frames. Once a frame has run past
+# its budget it samples the main thread's Python stack every few ms (via
+# sys._current_frames) until the frame ends; the frame is then logged with
+# its duration, the stack samples and the scene counts the game passes in
+# (JSONL, the file is rewritten each run).
+# Frames under budget cost two lock round-trips and no sampling.
+import json, os, sys, threading, time
+
+HITCH_MULT = 2.0               # budget = HITCH_MULT x the frame time at FPS
+HITCH_SAMPLE_MS = 2.0
+HITCH_STACK_DEPTH = 12         # innermost frames kept per sample
+HITCH_KEEP = 200               # hitch records kept in memory
+
+
+def _stack(frame):
+    out = []
+    while frame is not None and len(out) < HITCH_STACK_DEPTH:
+        co = frame.f_code
+        out.append(f"{os.path.basename(co.co_filename)}:{frame.f_lineno} {co.co_name}")
+        frame = frame.f_back
+    return out          # innermost first
+
+
+class HitchWatchdog:
+    def __init__(self, budget_ms, sample_ms=HITCH_SAMPLE_MS, log_path=None):
+        self.budget = budget_ms/1000.0
+        self.sample = sample_ms/1000.0
+        self.main_id = threading.get_ident()
+        self.log = open(log_path, "w") if log_path else None
+        self.hitches = []
+        self._frame = None          # (frame no, start time) while a frame runs
+        self._samples = []
+        self._stop = False
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._loop, name="hitch-watchdog", daemon=True)
+        self._thread.start()
+
+    def frame_start(self, n):
+        with self._cond:
+            self._frame = (n, time.perf_counter())
+            self._samples = []
+            self._cond.notify()
+
+    def frame_end(self, scene):
+        # scene: counts to log with a hitch (enemies, bullets, ...); returns the record if this was one
+        with self._cond:
+            if self._frame is None: return None
+            (n, start), self._frame = self._frame, None
+            samples = self._samples
+        ms = (time.perf_counter() - start)*1000
+        if ms <= self.budget*1000: return None
+        rec = {"frame": n, "ms": round(ms, 2), "budget_ms": round(self.budget*1000, 2), **scene,
+               "samples": samples}
+        self.hitches = self.hitches[-(HITCH_KEEP - 1):] + [rec]
+        if self.log:
+            self.log.write(json.dumps(rec) + "\n"); self.log.flush()
+        return rec
+
+    def _loop(self):
+        with self._cond:
+            while not self._stop:
+                cur = self._frame
+                if cur is None:
+                    self._cond.wait()
+                    continue
+                late = time.perf_counter() - cur[1] - self.budget
+                if late < 0:
+                    self._cond.wait(-late)      # wakes early if the frame ends
+                    continue
+                frame = sys._current_frames().get(self.main_id)
+                if frame is not None:
+                    self._samples.append({"at_ms": round((self.budget + late)*1000, 1), "stack": _stack(frame)})
+                del frame
+                self._cond.wait(self.sample)
+
+    def close(self):
+        with self._cond:
+            self._stop = True
+            self._cond.notify()
+        self._thread.join(timeout=1.0)
+        if self.log: self.log.close()
+
+    def report(self):
+        if not self.hitches: return "no hitches"
+        lines = [f"{len(self.hitches)} frames over {self.budget*1000:.1f} ms:"]
+        for h in sorted(self.hitches, key=lambda h: -h["ms"])[:10]:
+            top = h["samples"][0]["stack"][0] if h["samples"] else "-"
+            lines.append(f"  frame {h['frame']}: {h['ms']:.1f} ms, {len(h['samples'])} samples, in {top}")
+        return "\n".join(lines)
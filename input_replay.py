@@ -0,0 +1,50 @@
+# ==== Input recording / replay for headless runs ====
+# A frame of input is (held keys, mouse_rel, actions). Actions are the
+# one-shot inputs the game loop turns events into: "attack", "shield",
+# "switch", "mount", "restart" (see handle_action in the game).
+import json
+from pygame.locals import K_a, K_d, K_w, K_LEFT, K_RIGHT, K_UP, K_SPACE
+
+KEY_NAMES = {"a": K_a, "d": K_d, "w": K_w, "left": K_LEFT, "right": K_RIGHT, "up": K_UP, "space": K_SPACE}
+
+
+class HeldKeys:
+    # stands in for pygame.key.get_pressed(): keys[K_x] -> 1/0
+    def __init__(self, names=()):
+        self.codes = {KEY_NAMES[n] for n in names}
+    def __getitem__(self, code):
+        return 1 if code in self.codes else 0
+
+
+def pressed_names(keys):
+    return [n for n, code in KEY_NAMES.items() if keys[code]]
+
+
+class InputRecorder:
+    def __init__(self, path):
+        self.f = open(path, "w")
+        self.tick = 0
+    def record(self, keys, mouse_rel, actions):
+        held = pressed_names(keys)
+        if held or actions or mouse_rel != (0, 0):
+            self.f.write(json.dumps({"tick": self.tick, "keys": held, "mouse": list(mouse_rel),
+                                     "actions": list(actions)}) + "\n")
+        self.tick += 1
+    def close(self):
+        self.f.close()
+
+
+class ReplayPolicy:
+    # replays an InputRecorder file; ticks with no line are "no input"
+    def __init__(self, path):
+        self.frames = {}
+        with open(path) as f:
+            for line in f:
+                if line.strip():
+                    d = json.loads(line)
+                    self.frames[d["tick"]] = d
+        self.last = max(self.frames, default=-1)
+    def __call__(self, game, tick):
+        d = self.frames.get(tick)
+        if d is None: return HeldKeys(), (0, 0), ()
+        return HeldKeys(d["keys"]), tuple(d["mouse"]), d["actions"]
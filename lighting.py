@@ -0,0 +1,67 @@
+# ==== Night lighting ====
+# A screen-sized light map: filled with the ambient (darkness) colour, light
+# sprites added on top, then multiplied over the frame. The map is only
+# rebuilt when the time bucket or the (quantized) light set changes.
+import pygame
+from bg_cache import lerp_color
+
+LIGHT_TIME_BUCKETS = 32     # darkness levels over the day cycle
+LIGHT_POS_QUANT = 4         # px; smaller light moves reuse the last map
+MAX_LIGHTS = 32             # dynamic lights per frame (blits stay bounded)
+DAY_AMBIENT = (255, 255, 255)
+NIGHT_AMBIENT = (70, 80, 125)
+DUSK_START = 0.45           # t_frac where it starts getting dark
+LIGHT_RINGS = 24            # rings per light sprite (radial falloff)
+
+
+def darkness(t_frac):
+    # 0 by day, 1 at full night (smoothstep from dusk)
+    x = (t_frac - DUSK_START)/(1.0 - DUSK_START)
+    x = 0.0 if x < 0 else 1.0 if x > 1 else x
+    return x*x*(3 - 2*x)
+
+
+class LightMap:
+    def __init__(self):
+        self.sprites = {}       # (radius, colour) -> additive light sprite
+        self.overlay = None
+        self.key = None
+        self.hits = 0           # frames that reused the light map
+        self.misses = 0         # frames that rebuilt it
+
+    def light_sprite(self, radius, color):
+        key = (radius, color)
+        spr = self.sprites.get(key)
+        if spr is None:
+            spr = pygame.Surface((radius*2, radius*2))
+            spr.fill((0, 0, 0))
+            for i in range(LIGHT_RINGS, 0, -1):
+                r = max(1, radius*i//LIGHT_RINGS)
+                k = (1.0 - i/LIGHT_RINGS)**1.6   # soft edge, bright core
+                pygame.draw.circle(spr, lerp_color((0, 0, 0), color, k), (radius, radius), r)
+            self.sprites[key] = spr
+        return spr
+
+    def render(self, surface, t_frac, lights):
+        # lights: (x, y, radius, colour) in screen space
+        bucket = int(darkness(t_frac)*LIGHT_TIME_BUCKETS + 0.5)
+        if bucket == 0: return
+        W, H = surface.get_size()
+        q = LIGHT_POS_QUANT
+        visible = []
+        for x, y, r, c in lights:
+            if -r < x < W + r and -r < y < H + r:
+                visible.append((int(x)//q*q, int(y)//q*q, r, c))
+                if len(visible) >= MAX_LIGHTS: break
+        key = (bucket, (W, H), tuple(visible))
+        if key != self.key or self.overlay is None:
+            self.misses += 1
+            if self.overlay is None or self.overlay.get_size() != (W, H):
+                self.overlay = pygame.Surface((W, H))
+            self.overlay.fill(lerp_color(DAY_AMBIENT, NIGHT_AMBIENT, bucket/LIGHT_TIME_BUCKETS))
+            for x, y, r, c in visible:
+                self.overlay.blit(self.light_sprite(r, c), (x - r, y - r), special_flags=pygame.BLEND_RGB_ADD)
+            self.key = key
+        else:
+            self.hits += 1
+        surface.blit(self.overlay, (0, 0), special_flags=pygame.BLEND_RGB_MULT)
@@ -0,0 +1,81 @@
+# ==== Background loading with a progress screen ====
+# Level building and cache warm-up run on a worker thread;
+# the main thread keeps the window alive (events + a progress bar) and gets
+# the results back once the worker is done (display conversions happen there,
+# SDL wants them on the thread that owns the window).
+import threading, time
+import pygame
+from pygame.locals import QUIT, KEYDOWN, K_ESCAPE
+
+LOADER_FPS = 30
+BAR_W, BAR_H = 360, 14
+LOADER_BG = (18, 20, 28)
+LOADER_BAR = (200, 170, 90)
+
+
+class Loader:
+    def __init__(self, tasks):
+        # tasks: (label, fn); fn() runs on the worker, its result goes to results[label]
+        self.tasks = list(tasks)
+        self.results = {}
+        self.timings = {}       # label -> seconds
+        self.done = 0
+        self.current = ""
+        self.error = None
+        self._cancel = False
+        self._thread = threading.Thread(target=self._run, name="loader", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        for label, fn in self.tasks:
+            if self._cancel: return
+            self.current = label
+            t0 = time.perf_counter()
+            try:
+                self.results[label] = fn()
+            except Exception as e:      # re-raised on the main thread
+                self.error = e
+                return
+            self.timings[label] = time.perf_counter() - t0
+            self.done += 1
+
+    @property
+    def progress(self):
+        return self.done/len(self.tasks) if self.tasks else 1.0
+
+    def finished(self):
+        return not self._thread.is_alive()
+
+    def wait(self, timeout):
+        # frame pacing for the progress screen that returns as soon as the worker ends
+        self._thread.join(timeout)
+
+    def cancel(self):
+        # stop after the running task (it may hold pygame objects; don't quit under it)
+        self._cancel = True
+        self._thread.join()
+
+
+def draw_progress(surface, frac, label, font):
+    W, H = surface.get_size()
+    surface.fill(LOADER_BG)
+    x, y = (W - BAR_W)//2, H//2
+    pygame.draw.rect(surface, (60, 60, 70), (x - 2, y - 2, BAR_W + 4, BAR_H + 4))
+    pygame.draw.rect(surface, LOADER_BAR, (x, y, int(BAR_W*frac), BAR_H))
+    txt = font.render(f"Loading {label}", True, (220, 220, 220))
+    surface.blit(txt, (W//2 - txt.get_width()//2, y + BAR_H + 10))
+
+
+def run_loading_screen(loader, screen, font):
+    # main thread: pump events and draw the bar until the worker finishes.
+    # False if the window was closed meanwhile.
+    while not loader.finished():
+        for ev in pygame.event.get():
+            if ev.type == QUIT or (ev.type == KEYDOWN and ev.key == K_ESCAPE):
+                loader.cancel()
+                return False
+        draw_progress(screen, loader.progress, loader.current, font)
+        pygame.display.flip()
+        loader.wait(1.0/LOADER_FPS)
+    if loader.error is not None: raise loader.error
+    return True
@@ -0,0 +1,109 @@
+# ==== Per-subsystem memory report ====
+# Two views, because tracemalloc only sees Python's allocator:
+#   * pixel memory: SDL allocates surface pixels itself, so it is counted
+#     from the surfaces each entity / cache holds (pitch x height)
+#   * Python heap: tracemalloc snapshots at level load and after N seconds of
+#     play, grouped by the code that allocated (module, or top-level class /
+#     function of the game module) and mapped to subsystems
+# "growth" is what play added and kept; "churn" is the peak of short-lived
+# allocations over what stayed (only measurable as a whole). Tracing starts
+# in main(), after import; run with PYTHONTRACEMALLOC=1 to also see what the
+# modules allocate at import (particle arrays, the telemetry ring).
+import ast, os, tracemalloc
+from collections import OrderedDict
+import pygame
+
+MEM_SURFACE_DEPTH = 3          # containers followed when looking for surfaces
+
+
+def surface_bytes(s):
+    # a subsurface shares its parent's pixels
+    return 0 if s.get_parent() is not None else s.get_pitch()*s.get_height()
+
+
+def owned_surfaces(obj, depth=MEM_SURFACE_DEPTH):
+    if isinstance(obj, pygame.Surface):
+        yield obj
+        return
+    if depth == 0: return
+    if isinstance(obj, (list, tuple, set)): items = obj
+    elif isinstance(obj, (dict, OrderedDict)): items = obj.values()
+    elif hasattr(obj, "__dict__") and not isinstance(obj, type): items = vars(obj).values()
+    else: return
+    for v in items: yield from owned_surfaces(v, depth - 1)
+
+
+def pixel_table(owners):
+    # owners: name -> objects; each surface is counted once, for its first owner
+    seen = set()
+    rows = []
+    for name, objs in owners.items():
+        objs = list(objs)
+        total = 0
+        for o in objs:
+            for s in owned_surfaces(o):
+                if id(s) in seen: continue
+                seen.add(id(s))
+                total += surface_bytes(s)
+        rows.append((name, len(objs), total))
+    return rows
+
+
+def code_regions(path):
+    # (first line, last line, name) of the top-level classes and functions in a source file
+    with open(path) as f: tree = ast.parse(f.read())
+    return [(n.lineno, n.end_lineno, n.name) for n in tree.body
+            if isinstance(n, (ast.ClassDef, ast.FunctionDef))]
+
+
+class MemReport:
+    def __init__(self, game_file, subsystems, nframes=1):
+        # subsystems: "module.py" or top-level name in game_file -> subsystem label
+        self.game_file = os.path.abspath(game_file)
+        self.regions = code_regions(game_file)
+        self.subsystems = subsystems
+        self.nframes = nframes
+        self.snaps = {}
+        self.peak = None        # (current, peak) traced bytes at the "play" snapshot
+
+    def start(self):
+        if not tracemalloc.is_tracing(): tracemalloc.start(self.nframes)
+
+    def snapshot(self, label):
+        self.snaps[label] = tracemalloc.take_snapshot()
+        if label == "load": tracemalloc.reset_peak()
+        else: self.peak = tracemalloc.get_traced_memory()
+
+    def subsystem(self, filename, lineno):
+        if os.path.abspath(filename) == self.game_file:
+            for a, b, name in self.regions:
+                if a <= lineno <= b: return self.subsystems.get(name, "game (other)")
+            return "game (module level)"
+        base = os.path.basename(filename)
+        if base in self.subsystems: return self.subsystems[base]
+        return "pygame" if f"{os.sep}pygame{os.sep}" in filename else "other"
+
+    def heap_by_subsystem(self, label):
+        out = {}
+        for st in self.snaps[label].statistics("lineno"):
+            fr = st.traceback[0]
+            k = self.subsystem(fr.filename, fr.lineno)
+            out[k] = out.get(k, 0) + st.size
+        return out
+
+    def report(self, owners):
+        lines = ["pixel memory (SDL surfaces):",
+                 f"  {'owner':<16} {'count':>6} {'KB':>10} {'KB each':>9}"]
+        for name, n, b in pixel_table(owners):
+            lines.append(f"  {name:<16} {n:>6} {b/1024:>10.1f} {b/1024/max(n, 1):>9.1f}")
+        load = self.heap_by_subsystem("load")
+        play = self.heap_by_subsystem("play") if "play" in self.snaps else load
+        lines += ["", "python heap (tracemalloc):",
+                  f"  {'subsystem':<20} {'load KB':>9} {'play KB':>9} {'growth KB':>10}"]
+        for k in sorted(set(load) | set(play), key=lambda k: -play.get(k, 0)):
+            a, b = load.get(k, 0), play.get(k, 0)
+            lines.append(f"  {k:<20} {a/1024:>9.1f} {b/1024:>9.1f} {(b - a)/1024:>+10.1f}")
+        if "play" in self.snaps:
+            cur, peak = self.peak
+            lines.append(f"\n  churn: peak {peak/1024:.1f} KB over {cur/1024:.1f} KB kept during play")
+        return "\n".join(lines)
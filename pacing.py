@@ -0,0 +1,66 @@
+# ==== Frame pacing ====
+# How the loop waits for the next frame:
+#   sleep   clock.tick(fps): cheap, but sleeps at OS timer granularity
+#   busy    clock.tick_busy_loop(fps): spins, exact, burns a core
+#   hybrid  sleeps until HYBRID_SPIN_MS before the deadline, then spins
+#   vsync   no limiter; display.flip() blocks on the display's refresh
+#           (falls back to sleep if flip turns out not to block)
+# FramePacer.wait() replaces clock.tick() and keeps a window of frame
+# intervals for jitter (std dev, worst) and the CPU the process used.
+import math, time
+from collections import deque
+
+PACING_MODES = ("sleep", "busy", "hybrid", "vsync")
+HYBRID_SPIN_MS = 2.0
+JITTER_WINDOW = 120            # frames in the live stats
+
+
+class FramePacer:
+    def __init__(self, mode, fps, clock):
+        if mode not in PACING_MODES: raise ValueError(f"unknown pacing mode {mode!r}")
+        self.mode = mode
+        self.fps = fps
+        self.period = 1.0/fps
+        self.clock = clock
+        self.intervals = deque(maxlen=JITTER_WINDOW)     # ms
+        self.cpu = deque(maxlen=JITTER_WINDOW)           # process CPU s per frame
+        self._deadline = None
+        self._last = None
+        self._cpu_last = time.process_time()
+        self.fell_back = False
+
+    def wait(self):
+        # returns ms since the previous frame, like clock.tick()
+        if self.mode == "sleep": self.clock.tick(self.fps)
+        elif self.mode == "busy": self.clock.tick_busy_loop(self.fps)
+        elif self.mode == "hybrid": self._hybrid()
+        now = time.perf_counter()
+        cpu = time.process_time()
+        dt = 0.0 if self._last is None else (now - self._last)*1000
+        if self._last is not None:
+            self.intervals.append(dt)
+            self.cpu.append(cpu - self._cpu_last)
+        self._last, self._cpu_last = now, cpu
+        if self.mode == "vsync" and len(self.intervals) == JITTER_WINDOW and self.stats()[0] < self.period*500:
+            # running at more than twice the target rate: the driver ignores vsync
+            self.mode = "sleep"; self.fell_back = True; self.intervals.clear(); self.cpu.clear()
+        return dt
+
+    def _hybrid(self):
+        now = time.perf_counter()
+        if self._deadline is None or now - self._deadline > self.period:
+            self._deadline = now          # first frame, or fell a frame behind: resync
+            return
+        self._deadline += self.period
+        left = self._deadline - now - HYBRID_SPIN_MS/1000
+        if left > 0: time.sleep(left)
+        while time.perf_counter() < self._deadline: pass
+
+    def stats(self):
+        # (mean ms, std dev ms, worst ms, CPU share) over the window
+        n = len(self.intervals)
+        if n == 0: return 0.0, 0.0, 0.0, 0.0
+        mean = sum(self.intervals)/n
+        std = math.sqrt(sum((x - mean)**2 for x in self.intervals)/n)
+        cpu = sum(self.cpu)/(sum(self.intervals)/1000) if mean > 0 else 0.0
+        return mean, std, max(self.intervals), cpu
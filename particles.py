@@ -0,0 +1,97 @@
+# ==== Particle engine (hits, dust, sparks) ====
+# Particles live in flat NumPy arrays; live ones are packed at [0:n] so
+# integration, ageing and culling are a few vectorized ops per frame.
+# Drawing writes 2x2 blended dots straight into the target's pixels.
+import random
+import pygame
+
+try:
+    import numpy as np
+except ImportError:       # no particles without NumPy; emitters become no-ops
+    np = None
+
+PARTICLE_CAPACITY = 16384
+PARTICLE_GRAVITY = 0.35
+PARTICLE_DRAG = 0.97
+
+
+class ParticleSystem:
+    def __init__(self, capacity=PARTICLE_CAPACITY, gravity=PARTICLE_GRAVITY, drag=PARTICLE_DRAG):
+        self.capacity = capacity
+        self.gravity = gravity
+        self.drag = drag
+        self.n = 0
+        self.dropped = 0      # emits refused because the pool was full
+        if np is None: return
+        self.rng = np.random.default_rng(random.randrange(1 << 30))
+        self.pos = np.zeros((capacity, 2), np.float32)
+        self.vel = np.zeros((capacity, 2), np.float32)
+        self.life = np.zeros(capacity, np.float32)
+        self.max_life = np.ones(capacity, np.float32)
+        self.weight = np.ones(capacity, np.float32)      # gravity scale (dust < sparks)
+        self.color = np.zeros((capacity, 3), np.float32)
+
+    def emit(self, x, y, count, color, speed=(1.0, 4.0), life=(18, 36),
+             angle=None, spread=None, weight=1.0):
+        # angle/spread in radians (spread defaults to a quarter turn);
+        # without an angle the burst goes in every direction
+        if np is None: return
+        k = min(count, self.capacity - self.n)
+        self.dropped += count - k
+        if k <= 0: return
+        rng = self.rng; a, b = self.n, self.n + k
+        if angle is None:
+            ang = rng.uniform(0.0, 2*np.pi, k)
+        else:
+            ang = angle + rng.uniform(-0.5, 0.5, k)*(spread if spread is not None else np.pi/2)
+        sp = rng.uniform(speed[0], speed[1], k)
+        self.pos[a:b] = (x, y)
+        self.vel[a:b, 0] = np.cos(ang)*sp
+        self.vel[a:b, 1] = np.sin(ang)*sp
+        self.life[a:b] = rng.uniform(life[0], life[1], k)
+        self.max_life[a:b] = self.life[a:b]
+        self.weight[a:b] = weight
+        self.color[a:b] = np.clip(np.asarray(color, np.float32) + rng.uniform(-20, 20, (k, 3)), 0, 255)
+        self.n = b
+
+    def update(self):
+        n = self.n
+        if not n: return
+        vel = self.vel[:n]
+        vel[:, 1] += self.gravity*self.weight[:n]
+        vel *= self.drag
+        self.pos[:n] += vel
+        self.life[:n] -= 1
+        alive = self.life[:n] > 0
+        m = int(alive.sum())
+        if m < n:
+            # pack survivors to the front
+            for arr in (self.pos, self.vel, self.life, self.max_life, self.weight, self.color):
+                arr[:m] = arr[:n][alive]
+            self.n = m
+
+    def clear(self):
+        self.n = 0
+
+    def draw(self, surface, offset=(0, 0)):
+        n = self.n
+        if not n: return
+        W, H = surface.get_size()
+        xs = (self.pos[:n, 0] - offset[0]).astype(np.intp)
+        ys = (self.pos[:n, 1] - offset[1]).astype(np.intp)
+        on = (xs >= 0) & (xs < W - 1) & (ys >= 0) & (ys < H - 1)
+        if not on.any(): return
+        xs = xs[on]; ys = ys[on]
+        a = (self.life[:n][on]/self.max_life[:n][on])[:, None]
+        col = self.color[:n][on]
+        if surface.get_bitsize() < 24:
+            # no direct pixel access on palettized surfaces: fall back to fills
+            for x, y, c in zip(xs.tolist(), ys.tolist(), col.astype(np.uint8).tolist()):
+                surface.fill(c, (x, y, 2, 2))
+            return
+        px = pygame.surfarray.pixels3d(surface)
+        for dx, dy in ((0, 0), (1, 0), (0, 1), (1, 1)):
+            bx = xs + dx; by = ys + dy
+            bg = px[bx, by].astype(np.float32)
+            px[bx, by] = (bg + (col - bg)*a).astype(np.uint8)
+        del px    # unlock the surface
@@ -0,0 +1,31 @@
+# ==== Pose rasterization stage ====
+# Simulation only advances pose state (arms, walk cycle, lean); the images
+# are rasterized here, once per frame, for the humanoids in view. Each task
+# touches only its own humanoid (reads its pose, writes its .image), so the
+# tasks can run on a thread pool; pygame drops the GIL in its blits and
+# transforms.
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+POSE_WORKERS = min(8, os.cpu_count() or 1)
+POSE_PARALLEL_MIN = 6      # fewer visible humanoids than this: rasterize inline
+
+
+class PosePool:
+    def __init__(self, workers=POSE_WORKERS, parallel_min=POSE_PARALLEL_MIN):
+        self.workers = workers
+        self.parallel_min = parallel_min
+        self.pool = ThreadPoolExecutor(workers, thread_name_prefix="pose") if workers > 1 else None
+        self.built = 0       # images rasterized last frame
+
+    def rasterize(self, humanoids, time_s):
+        self.built = len(humanoids)
+        if self.pool is None or len(humanoids) < self.parallel_min:
+            for h in humanoids: h._build_image(time_s, tint=h.POSE_TINT)
+            return
+        # collect every result before the blit pass (and surface any error)
+        for f in [self.pool.submit(h._build_image, time_s, h.POSE_TINT) for h in humanoids]:
+            f.result()
+
+    def close(self):
+        if self.pool is not None: self.pool.shutdown(wait=True)
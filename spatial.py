@@ -0,0 +1,191 @@
+# ==== Spatial queries for the game (broadphase) ====
+# The level is very wide and short, so sorting on x alone prunes almost
+# everything: entities only overlap their neighbours in the sorted order.
+from bisect import bisect_left, bisect_right
+
+# Max distance an indexed entity may move between sync() and a query
+# (enemies walk ENEMY_SPEED=1.9 px per tick; the rest is headroom).
+SAP_SLACK = 32
+
+
+class SweepAndPrune:
+    def __init__(self, slack=SAP_SLACK):
+        self.slack = slack
+        self.items = []      # sprites sorted by rect.left
+        self.lefts = []      # rect.left of each item at sync time
+        self.kinds = {}      # sprite -> kind tag
+        self.max_w = 0
+
+    def sync(self, **groups):
+        # groups: kind=iterable of sprites, e.g. sync(enemy=enemies)
+        kinds = {}
+        for kind, group in groups.items():
+            for s in group: kinds[s] = kind
+        # keep last tick's order, drop dead sprites, append new ones
+        items = [s for s in self.items if s in kinds]
+        if len(items) != len(kinds):
+            known = set(items)
+            items.extend(s for s in kinds if s not in known)
+        # insertion sort: order barely changes tick to tick, so this is ~O(n)
+        for i in range(1, len(items)):
+            s = items[i]; x = s.rect.left; j = i - 1
+            while j >= 0 and items[j].rect.left > x:
+                items[j+1] = items[j]; j -= 1
+            items[j+1] = s
+        self.items = items
+        self.kinds = kinds
+        self.lefts = [s.rect.left for s in items]
+        self.max_w = max((s.rect.width for s in items), default=0)
+
+    def _span(self, left, right):
+        lo = bisect_left(self.lefts, left - self.max_w - self.slack)
+        hi = bisect_right(self.lefts, right + self.slack)
+        return self.items[lo:hi]
+
+    def query(self, rect, kind=None):
+        # sprites (of `kind`) whose current rect overlaps `rect`
+        kinds = self.kinds
+        for s in self._span(rect.left, rect.right):
+            if (kind is None or kinds.get(s) == kind) and s.alive() and s.rect.colliderect(rect):
+                yield s
+
+    def first(self, rect, kind=None):
+        return next(self.query(rect, kind), None)
+
+
+# Uniform hash grid for radius / nearest lookups (mount prompts, melee).
+# Entities are only re-bucketed when they cross a cell boundary.
+PROX_CELL = 128
+PROX_SLACK = 48      # query pad: movement since sync + offset of custom points (seat)
+
+
+class ProximityGrid:
+    def __init__(self, cell=PROX_CELL, slack=PROX_SLACK):
+        self.cell = cell
+        self.slack = slack
+        self.cells = {}      # (cx, cy) -> set of sprites
+        self.where = {}      # sprite -> ((cx, cy), kind)
+
+    def _key(self, x, y):
+        c = self.cell
+        return (int(x)//c, int(y)//c)
+
+    def update(self, s, kind):
+        key = self._key(*s.rect.center)
+        old = self.where.get(s)
+        if old is not None:
+            if old[0] == key and old[1] == kind: return
+            self._unlink(s, old[0])
+        self.cells.setdefault(key, set()).add(s)
+        self.where[s] = (key, kind)
+
+    def remove(self, s):
+        old = self.where.pop(s, None)
+        if old is not None: self._unlink(s, old[0])
+
+    def _unlink(self, s, key):
+        bucket = self.cells.get(key)
+        if bucket is not None:
+            bucket.discard(s)
+            if not bucket: del self.cells[key]
+
+    def sync(self, **groups):
+        seen = set()
+        for kind, group in groups.items():
+            for s in group:
+                self.update(s, kind); seen.add(s)
+        if len(seen) != len(self.where):
+            for s in [s for s in self.where if s not in seen]: self.remove(s)
+
+    def within(self, kind, point, r, pos=None):
+        # (sprite, dist) for sprites of `kind` within r of point;
+        # pos(s) picks the point measured on each sprite (default rect.center)
+        px, py = point
+        pad = r + self.slack
+        x0, y0 = self._key(px - pad, py - pad)
+        x1, y1 = self._key(px + pad, py + pad)
+        cells = self.cells; where = self.where
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                bucket = cells.get((cx, cy))
+                if not bucket: continue
+                for s in bucket:
+                    if where[s][1] != kind or not s.alive(): continue
+                    qx, qy = pos(s) if pos else s.rect.center
+                    d = ((qx - px)**2 + (qy - py)**2) ** 0.5
+                    if d <= r: yield s, d
+
+    def nearest(self, kind, point, r, pos=None):
+        best = None; best_d = r
+        for s, d in self.within(kind, point, r, pos):
+            if best is None or d < best_d: best = s; best_d = d
+        return best, best_d
+
+
+# Static grid over the platforms + DDA (Amanatides & Woo) ray traversal.
+# A ray only tests platforms in the cells it crosses, so cost ~ cells crossed.
+GRID_CELL = 64
+
+
+class PlatformGrid:
+    def __init__(self, cell=GRID_CELL):
+        self.cell = cell
+        self.cells = {}      # (cx, cy) -> list of platforms
+
+    def build(self, plats):
+        c = self.cell
+        self.cells = {}
+        for p in plats:
+            r = p.rect
+            for cx in range(r.left//c, (r.right - 1)//c + 1):
+                for cy in range(r.top//c, (r.bottom - 1)//c + 1):
+                    self.cells.setdefault((cx, cy), []).append(p)
+
+    def query_rect(self, rect):
+        c = self.cell; seen = set()
+        for cx in range(rect.left//c, (rect.right - 1)//c + 1):
+            for cy in range(rect.top//c, (rect.bottom - 1)//c + 1):
+                for p in self.cells.get((cx, cy), ()):
+                    if p not in seen:
+                        seen.add(p); yield p
+
+    def raycast(self, p0, p1):
+        # first platform hit on the segment p0->p1: (platform, (x, y)) or None
+        x0, y0 = p0; x1, y1 = p1
+        dx = x1 - x0; dy = y1 - y0
+        c = self.cell; cells = self.cells
+        cx = int(x0 // c); cy = int(y0 // c)
+        ex = int(x1 // c); ey = int(y1 // c)
+        inf = float("inf")
+        sx = 1 if dx > 0 else -1
+        sy = 1 if dy > 0 else -1
+        # ray parameter (0..1) at the next x / y cell boundary, and per-cell step
+        tmx = ((cx + (dx > 0))*c - x0)/dx if dx else inf
+        tmy = ((cy + (dy > 0))*c - y0)/dy if dy else inf
+        tdx = c/abs(dx) if dx else inf
+        tdy = c/abs(dy) if dy else inf
+        seg_len2 = dx*dx + dy*dy
+        tested = set()
+        best = None; best_t = inf
+        while True:
+            for p in cells.get((cx, cy), ()):
+                if p in tested: continue
+                tested.add(p)
+                clip = p.rect.clipline(x0, y0, x1, y1)
+                if not clip: continue
+                (ax, ay), (bx, by) = clip
+                ta = ((ax - x0)*dx + (ay - y0)*dy)/seg_len2 if seg_len2 else 0.0
+                tb = ((bx - x0)*dx + (by - y0)*dy)/seg_len2 if seg_len2 else 0.0
+                t = min(ta, tb)
+                if t < best_t:
+                    best_t = t; best = (p, (ax, ay) if ta <= tb else (bx, by))
+            # a hit before the next boundary can't be beaten by later cells
+            t_next = min(tmx, tmy)
+            if best is not None and best_t <= t_next: break
+            if (cx == ex and cy == ey) or t_next > 1.0: break
+            if tmx < tmy: cx += sx; tmx += tdx
+            else: cy += sy; tmy += tdy
+        return best
+
+    def line_of_sight(self, p0, p1):
+        return self.raycast(p0, p1) is None
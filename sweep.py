@@ -0,0 +1,160 @@
+# ==== Balance sweeps: many headless games across a process pool ====
+# Each run imports the game with the dummy SDL driver, applies config
+# overrides (module constants such as ENEMY_SPEED or ARROW_DAMAGE), drives it
+# with a scripted or recorded input policy and reports the outcome.
+#
+#   python sweep.py -p ENEMY_SPEED=1.5,1.9,2.5 -p ATTACK_RANGE=48,64,80 --seeds 4
+#   python sweep.py -p ENEMY_SHOOT_CD=300,750 --policy session.jsonl   # from --record-input
+import argparse, ast, csv, importlib, itertools, os, random, sys, time
+from concurrent.futures import ProcessPoolExecutor
+
+from input_replay import HeldKeys, ReplayPolicy
+
+GAME_MODULE = "game_pygame_main_sysem_"
+SWEEP_MAX_TICKS = 60*60*3          # 3 minutes of game time at FPS=60
+
+_game = None
+_defaults = {}                      # original values of overridden constants
+_replays = {}
+
+
+def load_game():
+    global _game
+    if _game is None:
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+        os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+        here = os.path.dirname(os.path.abspath(__file__))
+        if here not in sys.path: sys.path.insert(0, here)
+        _game = importlib.import_module(GAME_MODULE)
+    return _game
+
+
+# ---- scripted policies: (game, tick) -> (keys, mouse_rel, actions) ----
+def policy_idle(game, tick):
+    return HeldKeys(), (0, 0), ()
+
+def policy_advance(game, tick):
+    # walk right with the sword, swinging on a fixed rhythm
+    return HeldKeys(["d"]), (0, 0), (("attack",) if tick % 12 == 0 else ())
+
+def policy_archer(game, tick):
+    # bow; fire steadily, back off while an enemy is close
+    p = game.player
+    acts = []
+    if p.weapon != "bow": acts.append("switch")
+    if tick % 20 == 0: acts.append("attack")
+    close, _ = game.proximity.nearest("enemy", p.rect.center, 220)
+    return HeldKeys(["a"] if close else []), (0, 0), acts
+
+def policy_rider(game, tick):
+    # get on the horse, then ride right swinging the sword
+    p = game.player
+    if not p.mounted:
+        return HeldKeys(["d"]), (0, 0), (("mount",) if tick % 15 == 0 else ())
+    return HeldKeys(["d"]), (0, 0), (("attack",) if tick % 12 == 0 else ())
+
+POLICIES = {"idle": policy_idle, "advance": policy_advance, "archer": policy_archer, "rider": policy_rider}
+
+
+def get_policy(name):
+    if name in POLICIES: return POLICIES[name]
+    if name not in _replays: _replays[name] = ReplayPolicy(name)
+    return _replays[name]
+
+
+def run_instance(job):
+    g = load_game()
+    for k, v in _defaults.items(): setattr(g, k, v)
+    for k, v in job["overrides"].items():
+        if not hasattr(g, k): raise KeyError(f"unknown config constant {k}")
+        _defaults.setdefault(k, getattr(g, k))
+        setattr(g, k, v)
+    g.RENDER_POSES = False
+    g.AI_BUDGET = None          # think budget in ticks only, not wall-clock time
+    g.ensure_level()            # the first build draws random numbers; keep it before the seed
+    random.seed(job["seed"])
+    g.last_switch = g.last_mount_toggle = -1000
+    g.restart_game()
+    policy = get_policy(job["policy"])
+    fps = g.FPS
+    ticks = 0
+    t0 = time.perf_counter()
+    for tick in range(job["max_ticks"]):
+        keys, mouse_rel, actions = policy(g, tick)
+        now = tick*1000//fps
+        for act in actions: g.handle_action(act, now)
+        g.step_world(keys, mouse_rel, tick/fps)
+        ticks = tick + 1
+        if g.game_over or g.game_won: break
+    elapsed = time.perf_counter() - t0
+    outcome = "win" if g.game_won else "loss" if g.game_over else "timeout"
+    return {**job["overrides"], "policy": job["policy"], "seed": job["seed"], "outcome": outcome,
+            "ticks": ticks, "time_to_win_s": round(ticks/fps, 2) if outcome == "win" else None,
+            "damage_taken": g.player.damage_taken, "enemies_left": len(g.enemies),
+            "tps": round(ticks/elapsed, 1) if elapsed > 0 else None}
+
+
+def parse_param(spec):
+    name, _, values = spec.partition("=")
+    if not values: raise argparse.ArgumentTypeError(f"expected NAME=v1,v2,... got {spec!r}")
+    return name.strip(), [ast.literal_eval(v.strip()) for v in values.split(",")]
+
+
+def summarize(rows, names):
+    # one line per config: win rate and means over seeds
+    groups = {}
+    for r in rows:
+        groups.setdefault(tuple(r[n] for n in names), []).append(r)
+    out = []
+    for key, rs in groups.items():
+        wins = [r["time_to_win_s"] for r in rs if r["outcome"] == "win"]
+        out.append({**dict(zip(names, key)), "runs": len(rs),
+                    "win_rate": round(len(wins)/len(rs), 2),
+                    "time_to_win_s": round(sum(wins)/len(wins), 1) if wins else None,
+                    "damage_taken": round(sum(r["damage_taken"] for r in rs)/len(rs), 1),
+                    "enemies_left": round(sum(r["enemies_left"] for r in rs)/len(rs), 1),
+                    "tps": round(sum(r["tps"] or 0 for r in rs)/len(rs))})
+    return out
+
+
+def print_table(rows):
+    if not rows: return
+    cols = list(rows[0])
+    cells = [[("-" if r[c] is None else str(r[c])) for c in cols] for r in rows]
+    widths = [max(len(c), *(len(row[i]) for row in cells)) for i, c in enumerate(cols)]
+    print("  ".join(c.rjust(w) for c, w in zip(cols, widths)))
+    for row in cells:
+        print("  ".join(v.rjust(w) for v, w in zip(row, widths)))
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Headless parameter sweep for balance tuning")
+    ap.add_argument("-p", "--param", type=parse_param, action="append", default=[],
+                    metavar="NAME=v1,v2,...", help="config constant and values to sweep (repeatable)")
+    ap.add_argument("--seeds", type=int, default=3, help="runs per config")
+    ap.add_argument("--policy", default="advance",
+                    help=f"scripted policy ({', '.join(POLICIES)}) or a JSONL file from the game's --record-input")
+    ap.add_argument("--ticks", type=int, default=SWEEP_MAX_TICKS, help="tick limit per run")
+    ap.add_argument("--workers", type=int, default=os.cpu_count(), help="process pool size")
+    ap.add_argument("--csv", metavar="PATH", help="also write every run to a CSV file")
+    args = ap.parse_args(argv)
+
+    names = [n for n, _ in args.param]
+    combos = list(itertools.product(*(vals for _, vals in args.param)))
+    jobs = [{"overrides": dict(zip(names, combo)), "policy": args.policy, "seed": seed, "max_ticks": args.ticks}
+            for combo in combos for seed in range(args.seeds)]
+    t0 = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        rows = list(pool.map(run_instance, jobs))
+    wall = time.perf_counter() - t0
+
+    if args.csv:
+        with open(args.csv, "w", newline="") as f:
+            w = csv.DictWriter(f, fieldnames=list(rows[0]))
+            w.writeheader(); w.writerows(rows)
+    print_table(summarize(rows, names))
+    print(f"\n{len(rows)} runs, {sum(r['ticks'] for r in rows)} ticks in {wall:.1f}s on {args.workers} workers")
+
+
+if __name__ == "__main__":
+    main()
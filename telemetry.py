@@ -0,0 +1,159 @@
+# ==== Per-frame telemetry ====
+# The game records one row per frame (phase timings, entity counts, cache hit
+# rates, memory) into a preallocated ring buffer; rows are written as JSONL on
+# exit or on a hotkey. Each run truncates its file on the first write, so a
+# file holds one session (files written by older builds may hold several,
+# each starting at a header line). The CLI summarizes a session and compares
+# it with a baseline:
+#
+#   python telemetry.py session.jsonl
+#   python telemetry.py session.jsonl --baseline last_release.jsonl
+#   python telemetry.py merged.jsonl --session 0      # first session in the file
+import argparse, json, os, sys, time
+from array import array
+
+TELEMETRY_FRAMES = 60*60*5      # 5 minutes at 60 fps
+REGRESSION_PCT = 0.10           # p95 this much worse than the baseline is a regression
+REGRESSION_MIN_MS = 0.2         # ... and at least this much (ignores noise on tiny phases)
+HIT_RATE_DROP = 0.05
+
+
+def rss_mb():
+    # resident set size; peak RSS where /proc is missing
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1])*os.sysconf("SC_PAGE_SIZE")/2**20
+    except (OSError, ValueError, AttributeError):
+        try:
+            import resource
+            kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            return kb/2**20 if sys.platform == "darwin" else kb/1024
+        except ImportError:
+            return 0.0
+
+
+def hit_rate(cache):
+    n = cache.hits + cache.misses
+    return cache.hits/n if n else 1.0
+
+
+class Telemetry:
+    def __init__(self, fields, capacity=TELEMETRY_FRAMES, meta=None):
+        self.fields = tuple(fields)
+        self.nf = len(self.fields)
+        self.capacity = capacity
+        self.buf = array("d", bytes(8*capacity*self.nf))
+        self.count = 0          # rows recorded
+        self.flushed = 0        # rows already written
+        self.meta = meta or {}
+        self._header_written = set()
+
+    def record(self, row):
+        # row: values in field order
+        i = (self.count % self.capacity)*self.nf
+        self.buf[i:i + self.nf] = array("d", row)
+        self.count += 1
+
+    def rows(self, start=0):
+        # dicts for the rows still in the buffer, oldest first
+        start = max(start, self.count - self.capacity)
+        for n in range(start, self.count):
+            i = (n % self.capacity)*self.nf
+            yield dict(zip(self.fields, self.buf[i:i + self.nf]))
+
+    def flush(self, path):
+        # write the rows not yet written; the first flush to a path truncates
+        # it and starts it with a header line, later ones append
+        first = path not in self._header_written
+        with open(path, "w" if first else "a") as f:
+            if first:
+                f.write(json.dumps({"fields": self.fields, "meta": self.meta,
+                                    "started": time.strftime("%Y-%m-%dT%H:%M:%S")}) + "\n")
+                self._header_written.add(path)
+            for row in self.rows(self.flushed):
+                f.write(json.dumps(row) + "\n")
+        written = self.count - max(self.flushed, self.count - self.capacity)
+        self.flushed = self.count
+        return written
+
+
+# ---- summary CLI ----
+def load_sessions(path):
+    # [(header, rows)], split on header lines
+    sessions = []
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                d = json.loads(line)
+                if "fields" in d: sessions.append((d, []))
+                elif sessions: sessions[-1][1].append(d)
+                else: sessions.append(({}, [d]))       # rows without a header
+    return sessions
+
+
+def load_jsonl(path, session=-1):
+    # rows of one session (the last by default)
+    sessions = load_sessions(path)
+    if not sessions: return []
+    return sessions[session][1]
+
+
+def percentile(sorted_vals, q):
+    if not sorted_vals: return 0.0
+    return sorted_vals[min(len(sorted_vals) - 1, int(q*len(sorted_vals)))]
+
+
+def summarize(rows):
+    # field -> {p50, p95, p99, max, last}, over every field any row has
+    out = {}
+    for k in dict.fromkeys(k for r in rows for k in r):
+        col = [r[k] for r in rows if k in r]
+        vals = sorted(col)
+        out[k] = {"p50": percentile(vals, 0.50), "p95": percentile(vals, 0.95),
+                  "p99": percentile(vals, 0.99), "max": vals[-1], "last": col[-1]}
+    return out
+
+
+def regressions(cur, base):
+    found = []
+    for k, s in cur.items():
+        b = base.get(k)
+        if b is None: continue
+        if k.endswith("_ms") or k == "rss_mb":
+            if s["p95"] > b["p95"]*(1 + REGRESSION_PCT) and s["p95"] - b["p95"] > REGRESSION_MIN_MS:
+                found.append(f"{k}: p95 {b['p95']:.2f} -> {s['p95']:.2f}")
+        elif k.endswith("_hit"):
+            if s["last"] < b["last"] - HIT_RATE_DROP:
+                found.append(f"{k}: hit rate {b['last']:.2f} -> {s['last']:.2f}")
+    return found
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Summarize a telemetry JSONL session")
+    ap.add_argument("session")
+    ap.add_argument("--baseline", metavar="PATH", help="session to compare against; exits 1 on regressions")
+    ap.add_argument("--session", dest="index", type=int, default=-1, metavar="N",
+                    help="which session of a file holding several (default: the last)")
+    args = ap.parse_args(argv)
+
+    sessions = load_sessions(args.session)
+    if not sessions: sys.exit(f"{args.session}: no frames")
+    try: header, rows = sessions[args.index]
+    except IndexError: sys.exit(f"{args.session}: {len(sessions)} sessions, no session {args.index}")
+    if not rows: sys.exit(f"{args.session}: no frames")
+    cur = summarize(rows)
+    started = f", started {header['started']}" if "started" in header else ""
+    print(f"{len(rows)} frames (session {args.index % len(sessions) + 1} of {len(sessions)}{started})")
+    print(f"{'field':>14} {'p50':>9} {'p95':>9} {'p99':>9} {'max':>9}")
+    for k, s in cur.items():
+        if k in ("frame", "t"): continue
+        print(f"{k:>14} {s['p50']:9.2f} {s['p95']:9.2f} {s['p99']:9.2f} {s['max']:9.2f}")
+    if args.baseline:
+        found = regressions(cur, summarize(load_jsonl(args.baseline)))
+        print("\nregressions vs baseline:" if found else "\nno regressions vs baseline")
+        for line in found: print("  " + line)
+        if found: sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+# ==== Chrome trace-event zones ====
+# Tracer.wrap() swaps a function/method for a timed wrapper that records one
+# complete ("X") event per call; save() writes Chrome trace-event JSON, which
+# chrome://tracing or https://ui.perfetto.dev open as a per-thread timeline.
+# Nothing is wrapped unless tracing is turned on, so zones cost nothing when
+# it is off.
+import functools, json, os, threading, time
+
+TRACE_MAX_EVENTS = 2_000_000   # ~10 min of a busy scene; later events are dropped
+
+
+class Tracer:
+    def __init__(self, max_events=TRACE_MAX_EVENTS):
+        self.events = []        # (name, start_us, dur_us, thread id)
+        self.max_events = max_events
+        self.dropped = 0
+        self.t0 = time.perf_counter_ns()
+        self._orig = []
+
+    def wrap(self, owner, attr, name=None):
+        # owner: class, module or instance whose `attr` gets the zone
+        fn = getattr(owner, attr)
+        if name is None:
+            name = f"{owner.__name__}.{attr}" if isinstance(owner, type) else attr
+        events, clock, t0, get_ident = self.events, time.perf_counter_ns, self.t0, threading.get_ident
+
+        @functools.wraps(fn)
+        def zone(*args, **kwargs):
+            start = clock()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                if len(events) < self.max_events:
+                    events.append((name, (start - t0)//1000, (clock() - start)//1000, get_ident()))
+                else:
+                    self.dropped += 1
+        self._orig.append((owner, attr, attr in vars(owner), vars(owner).get(attr)))
+        setattr(owner, attr, zone)
+
+    def mark(self, name):
+        # instant event (e.g. frame boundaries)
+        if len(self.events) < self.max_events:
+            self.events.append((name, (time.perf_counter_ns() - self.t0)//1000, None, threading.get_ident()))
+
+    def unwrap(self):
+        for owner, attr, own, fn in reversed(self._orig):
+            if own: setattr(owner, attr, fn)
+            else: delattr(owner, attr)       # was inherited / a class attribute
+        self._orig.clear()
+
+    def save(self, path):
+        pid = os.getpid()
+        names = {t.ident: t.name for t in threading.enumerate()}
+        out = [{"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": names.get(tid, str(tid))}}
+               for tid in {e[3] for e in self.events}]
+        for name, ts, dur, tid in self.events:
+            if dur is None:
+                out.append({"name": name, "ph": "i", "s": "t", "ts": ts, "pid": pid, "tid": tid})
+            else:
+                out.append({"name": name, "ph": "X", "ts": ts, "dur": dur, "pid": pid, "tid": tid})
+        with open(path, "w") as f:
+            json.dump({"traceEvents": out, "displayTimeUnit": "ms"}, f)
+        return len(self.events)
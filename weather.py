@@ -0,0 +1,106 @@
+# ==== Weather (rain / snow) ====
+# Precipitation is a few tileable textures baked once per kind and scrolled
+# with wind and camera parallax, so a full-screen shower is one blit per
+# depth layer. Intensity follows a looping timeline with fades.
+import random
+import pygame
+
+from bg_cache import display_thread
+
+WEATHER_TILE = 256          # tile size; textures wrap on this period
+WEATHER_FADE_S = 6.0        # fade in/out at the ends of a timeline segment
+# (seconds, kind, intensity); kind None = clear sky
+WEATHER_TIMELINE = [(45, None, 0.0), (35, "rain", 1.0), (30, None, 0.0), (35, "snow", 0.85)]
+
+# per kind: layers from far to near -> (drops per tile, velocity px/s, parallax, size, colour)
+WEATHER_LAYERS = {
+    "rain": [(140, (-70, 520), 0.25, 9, (170, 180, 210, 110)),
+             (70, (-110, 820), 0.6, 15, (200, 210, 235, 160))],
+    "snow": [(120, (-12, 40), 0.25, 1, (230, 235, 245, 150)),
+             (50, (-25, 75), 0.6, 2, (250, 250, 255, 210))],
+}
+
+
+def _bake_tile(kind, count, vel, size, color, seed):
+    rnd = random.Random(seed)
+    T = WEATHER_TILE
+    tile = pygame.Surface((T, T), pygame.SRCALPHA)
+    vx, vy = vel
+    for _ in range(count):
+        x = rnd.uniform(0, T); y = rnd.uniform(0, T)
+        # draw every drop on all wrapped copies so the tile is seamless
+        for ox in (-T, 0, T):
+            for oy in (-T, 0, T):
+                px, py = x + ox, y + oy
+                if kind == "rain":
+                    k = size/((vx*vx + vy*vy) ** 0.5)
+                    pygame.draw.line(tile, color, (px, py), (px + vx*k, py + vy*k), 1)
+                else:
+                    pygame.draw.circle(tile, color, (int(px), int(py)), size)
+    return tile
+
+
+class Weather:
+    def __init__(self, timeline=WEATHER_TIMELINE, layers=WEATHER_LAYERS, seed=0):
+        self.timeline = timeline
+        self.layers = layers
+        self.seed = seed
+        self.period = sum(seg[0] for seg in timeline)
+        self.textures = {}   # (kind, screen size) -> [(surface, vel, parallax)]
+        self.unconverted = set()     # texture keys baked off the main thread
+
+    def state(self, t):
+        # (kind, intensity) at time t seconds
+        if not self.period: return None, 0.0
+        u = t % self.period
+        for dur, kind, amount in self.timeline:
+            if u < dur:
+                fade = min(1.0, u/WEATHER_FADE_S, (dur - u)/WEATHER_FADE_S)
+                return kind, amount*fade
+            u -= dur
+        return None, 0.0
+
+    def _textures(self, kind, size):
+        key = (kind, size)
+        tex = self.textures.get(key)
+        if tex is None:
+            W, H = size; T = WEATHER_TILE
+            on_display = display_thread()
+            tex = []
+            for i, (count, vel, parallax, dsize, color) in enumerate(self.layers[kind]):
+                tile = _bake_tile(kind, count, vel, dsize, color, self.seed*31 + i)
+                # expand to screen + one tile, so any scroll offset is a single sub-rect blit
+                big = pygame.Surface((W + T, H + T), pygame.SRCALPHA)
+                for x in range(0, W + T, T):
+                    for y in range(0, H + T, T):
+                        big.blit(tile, (x, y))
+                if on_display: big = big.convert_alpha()
+                tex.append((big, vel, parallax))
+            self.textures = {k: v for k, v in self.textures.items() if k[1] == size}
+            self.textures[key] = tex
+            self.unconverted = {k for k in self.unconverted if k in self.textures}
+            if not on_display: self.unconverted.add(key)
+        return tex
+
+    def convert_all(self):
+        # main thread: convert textures warm() baked on the loader's worker
+        if not display_thread(): return
+        for key in self.unconverted:
+            self.textures[key] = [(big.convert_alpha(), vel, parallax) for big, vel, parallax in self.textures[key]]
+        self.unconverted.clear()
+
+    def warm(self, size):
+        # bake every kind on the timeline now; baking on first use is a 10-15 ms frame
+        for kind in dict.fromkeys(seg[1] for seg in self.timeline):
+            if kind is not None: self._textures(kind, size)
+
+    def draw(self, surface, t, offset_x=0.0):
+        kind, amount = self.state(t)
+        if kind is None or amount <= 0.01: return
+        W, H = surface.get_size(); T = WEATHER_TILE
+        alpha = int(255*amount)
+        for big, (vx, vy), parallax in self._textures(kind, (W, H)):
+            ox = int(offset_x*parallax - t*vx) % T
+            oy = int(-t*vy) % T
+            if big.get_alpha() != alpha: big.set_alpha(alpha)
+            surface.blit(big, (0, 0), (ox, oy, W, H))